@@ -0,0 +1,219 @@
+"""Importer and exporter benchmarks on synthetic solves.
+
+Every case writes a file with generate_ma.py and times three phases:
+
+    parse   mayaascii_parser.parse_file
+    build   the importer's importTracking, creating the Blender scene
+    export  the exporter's exportTracking on the imported scene
+
+and reports nodes/s and keys/s for each. In plain Python the Blender side
+runs against the recording bpy stub in bpy_stub/; inside Blender the real
+bpy is used:
+
+    python benchmarks/bench.py
+    blender -b --factory-startup --python benchmarks/bench.py -- --update
+
+Results are compared with baseline.json (per backend, stub or blender) and
+the run fails if a throughput drops below (1 - tolerance) of the baseline.
+--update stores the current results as the new baseline.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+try:
+    import bpy
+except ImportError:
+    sys.path.insert(0, os.path.join(HERE, 'bpy_stub'))
+    import bpy
+
+import generate_ma
+import io_export_scene_MayaASCII
+import io_import_scene_MayaASCII
+from mayaascii_parser import parse_file
+
+STUB = getattr(bpy, 'STUB', False)
+BASELINE = os.path.join(HERE, 'baseline.json')
+
+# name, frames, locators, animated tracks, keys per line (0 = no wrapping)
+CASES = (
+    ('matchmover', 141, 2500, 0, 0),
+    ('long_shot', 2000, 500, 0, 0),
+    ('animated', 500, 300, 300, 0),
+    ('wrapped', 500, 300, 300, 8),
+    )
+
+
+def best_of(repeat, run, setup=None):
+    """Return (seconds, result) of the fastest of repeat runs."""
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.time()
+        result = run()
+        seconds = time.time() - start
+        if best is None or seconds < best[0]:
+            best = (seconds, result)
+    return best
+
+
+def scene_counts(scene):
+    """Return the (nodes, keys) of a parsed MayaScene."""
+    return len(scene.nodes), sum(len(node.keys()) for node in scene.nodes)
+
+
+def blend_counts():
+    """Return the (objects, keys) of the current Blender file."""
+    keys = sum(len(fcurve.keyframe_points) for action in bpy.data.actions for fcurve in action.fcurves)
+    return len(bpy.data.objects), keys
+
+
+def new_file():
+    if STUB:
+        bpy.reset()
+    else:
+        bpy.ops.wm.read_factory_settings()
+        for obj in list(bpy.data.objects):
+            bpy.data.objects.remove(obj)
+
+
+def run_operator(cls, module, filename, **settings):
+    """Run the import or export operator class of module on filename."""
+    if STUB:
+        op = cls()
+        for key, value in settings.items():
+            setattr(op, key, value)
+        op.filepath = filename
+        return op.execute(bpy.context)
+    group, name = cls.bl_idname.split('.')
+    operator = getattr(getattr(bpy.ops, group), name)
+    try:
+        operator.get_rna()
+    except KeyError:
+        module.register()
+    return operator(filepath=filename, **settings)
+
+
+def select_for_export():
+    scene = bpy.context.scene
+    camera = scene.camera
+    objects = [o for o in bpy.data.objects if o.type == 'EMPTY']
+    if STUB:
+        bpy.context.selected_objects = [camera] + objects
+        bpy.context.object = bpy.context.active_object = camera
+    else:
+        for obj in [camera] + objects:
+            obj.select_set(True) if hasattr(obj, 'select_set') else setattr(obj, 'select', True)
+        if hasattr(scene, 'objects') and hasattr(scene.objects, 'active'):
+            scene.objects.active = camera
+        else:
+            bpy.context.view_layer.objects.active = camera
+    return 1 + len(objects)
+
+
+def run_case(case, directory, repeat):
+    name, frames, locators, animated, wrap = case
+    filename = os.path.join(directory, name + '.ma')
+    with open(filename, 'w') as file:
+        generate_ma.write_scene(file, frames, locators, animated, wrap)
+    results = {}
+
+    seconds, scene = best_of(repeat, lambda: parse_file(filename))
+    nodes, keys = scene_counts(scene)
+    results['parse'] = (seconds, nodes, keys)
+
+    def build():
+        run_operator(io_import_scene_MayaASCII.ImportMayaASCII, io_import_scene_MayaASCII, filename,
+                     use_cache=False, enumber=locators, include_bg=False)
+        return blend_counts()
+    seconds, counts = best_of(repeat, build, new_file)
+    results['build'] = (seconds,) + counts
+
+    select_for_export()
+    output = os.path.join(directory, name + '_export.ma')
+    seconds, _ = best_of(repeat, lambda: run_operator(
+        io_export_scene_MayaASCII.ExportMayaASCII, io_export_scene_MayaASCII, output,
+        enumber=locators + 1, anim_empties=animated > 0))
+    results['export'] = (seconds,) + scene_counts(parse_file(output))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return the list of regressions of results against baseline."""
+    failures = []
+    for case, phases in sorted(results.items()):
+        for phase, (seconds, nodes, keys) in sorted(phases.items()):
+            reference = baseline.get(case, {}).get(phase)
+            if reference is None:
+                continue
+            for unit, count, index in (('nodes/s', nodes, 1), ('keys/s', keys, 2)):
+                if not count or not reference[index]:
+                    continue
+                rate = count / max(seconds, 1e-9)
+                expected = reference[index] / max(reference[0], 1e-9)
+                if rate < expected * (1 - tolerance):
+                    failures.append('%s %s: %.0f %s, baseline %.0f' % (case, phase, rate, unit, expected))
+    return failures
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('cases', nargs='*', help='cases to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per phase, the fastest counts')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='allowed fraction of slowdown against the baseline')
+    parser.add_argument('--update', action='store_true', help='store the results as the baseline')
+    parser.add_argument('--baseline', default=BASELINE)
+    args = parser.parse_args(argv)
+
+    backend = 'stub' if STUB else 'blender'
+    directory = tempfile.mkdtemp(prefix='mayaascii_bench')
+    results = {}
+    try:
+        for case in CASES:
+            if args.cases and case[0] not in args.cases:
+                continue
+            results[case[0]] = run_case(case, directory, args.repeat)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print('%-12s %-7s %9s %8s %9s %12s %12s' % ('case', 'phase', 'seconds', 'nodes', 'keys',
+                                                'nodes/s', 'keys/s'))
+    for case, phases in sorted(results.items()):
+        for phase in ('parse', 'build', 'export'):
+            seconds, nodes, keys = phases[phase]
+            print('%-12s %-7s %9.3f %8d %9d %12.0f %12.0f' % (
+                case, phase, seconds, nodes, keys, nodes / seconds, keys / seconds))
+
+    try:
+        with open(args.baseline) as file:
+            baselines = json.load(file)
+    except (IOError, OSError, ValueError):
+        baselines = {}
+    if args.update:
+        baselines.setdefault(backend, {}).update(results)
+        with open(args.baseline, 'w') as file:
+            json.dump(baselines, file, indent=1, sort_keys=True)
+        print('Baseline updated (%s).' % backend)
+        return 0
+    failures = compare(results, baselines.get(backend, {}), args.tolerance)
+    for failure in failures:
+        print('REGRESSION ' + failure)
+    if not baselines.get(backend):
+        print('No %s baseline, run with --update to store one.' % backend)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
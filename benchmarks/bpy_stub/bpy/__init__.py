@@ -0,0 +1,388 @@
+"""Recording stand-in for Blender's bpy module, used by the benchmarks.
+
+It keeps just enough of Blender's data model for the importer and exporter
+to run outside Blender: objects, cameras, meshes, groups, actions with
+F-curves and a scene. The data lives in numpy arrays, so the benchmarks
+measure the add-on's own work. Every datablock creation and operator call
+is counted in `calls`; reset() starts over with an empty file.
+"""
+import collections
+
+import numpy as np
+
+from . import props
+
+calls = collections.Counter()
+INTERPOLATIONS = ('CONSTANT', 'LINEAR', 'BEZIER')
+reports = []
+
+
+class KeyframePoint(object):
+
+    def __init__(self, points, index):
+        self.points = points
+        self.index = index
+
+    @property
+    def interpolation(self):
+        return self.points.interpolation[self.index]
+
+    @interpolation.setter
+    def interpolation(self, value):
+        self.points.interpolation[self.index] = value
+
+
+class KeyframePoints(object):
+
+    def __init__(self):
+        self.co = np.empty((0, 2), dtype=np.float32)
+        self.interpolation = []
+
+    def __len__(self):
+        return len(self.co)
+
+    def __iter__(self):
+        return iter([KeyframePoint(self, i) for i in range(len(self.co))])
+
+    def add(self, count):
+        calls['keyframe_points.add'] += 1
+        self.co = np.concatenate((self.co, np.zeros((count, 2), dtype=np.float32)))
+        self.interpolation.extend(['BEZIER'] * count)
+
+    def foreach_set(self, attr, seq):
+        if attr == 'interpolation':
+            self.interpolation[:] = [INTERPOLATIONS[i] for i in np.asarray(seq).tolist()]
+        else:
+            self.co[:] = np.asarray(seq, dtype=np.float32).reshape(-1, 2)
+
+    def foreach_get(self, attr, seq):
+        seq[:] = self.co.ravel()
+
+
+class FCurve(object):
+
+    def __init__(self, data_path, index, group):
+        self.data_path = data_path
+        self.array_index = index
+        self.group = group
+        self.mute = False
+        self.keyframe_points = KeyframePoints()
+        self.modifiers = []
+
+    def update(self):
+        pass
+
+    def evaluate(self, frame):
+        co = self.keyframe_points.co
+        return float(np.interp(frame, co[:, 0], co[:, 1]))
+
+
+class FCurves(list):
+
+    def new(self, data_path, index=0, action_group=''):
+        calls['fcurves.new'] += 1
+        fcurve = FCurve(data_path, index, action_group)
+        self.append(fcurve)
+        return fcurve
+
+
+class AnimData(object):
+
+    def __init__(self):
+        self.action = None
+        self.drivers = []
+        self.nla_tracks = []
+
+
+class ID(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.animation_data = None
+        self._props = {}
+
+    def animation_data_create(self):
+        self.animation_data = AnimData()
+        return self.animation_data
+
+    def __getitem__(self, key):
+        return self._props[key]
+
+    def __setitem__(self, key, value):
+        self._props[key] = value
+
+    def __contains__(self, key):
+        return key in self._props
+
+    def get(self, key, default=None):
+        return self._props.get(key, default)
+
+
+class Action(ID):
+
+    def __init__(self, name):
+        ID.__init__(self, name)
+        self.fcurves = FCurves()
+
+
+class Camera(ID):
+
+    def __init__(self, name):
+        ID.__init__(self, name)
+        self.lens = 35.0
+        self.sensor_width = 32.0
+        self.clip_start = 0.1
+        self.clip_end = 100.0
+        self.dof_distance = 0.0
+
+
+class Buffer(object):
+    """A property collection read and written with foreach_get/foreach_set."""
+
+    def __init__(self, size=0):
+        self.values = {}
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def add(self, count):
+        self.size += count
+
+    def foreach_set(self, attr, seq):
+        self.values[attr] = np.array(seq)
+
+    def foreach_get(self, attr, seq):
+        seq[:] = self.values.get(attr, 0)
+
+
+class Attribute(object):
+
+    def __init__(self, size):
+        self.data = Buffer(size)
+
+
+class Attributes(dict):
+
+    def __init__(self, mesh):
+        dict.__init__(self)
+        self.mesh = mesh
+
+    def new(self, name, type, domain):
+        self[name] = Attribute(len(self.mesh.vertices))
+        return self[name]
+
+
+class Mesh(ID):
+
+    def __init__(self, name):
+        ID.__init__(self, name)
+        self.vertices = Buffer()
+        self.attributes = Attributes(self)
+
+    def update(self):
+        pass
+
+
+class ObjectList(list):
+
+    def link(self, obj):
+        calls['objects.link'] += 1
+        self.append(obj)
+
+    def unlink(self, obj):
+        self.remove(obj)
+
+    def __contains__(self, item):
+        if isinstance(item, str):
+            return any(obj.name == item for obj in self)
+        return list.__contains__(self, item)
+
+
+class Group(ID):
+
+    def __init__(self, name):
+        ID.__init__(self, name)
+        self.objects = ObjectList()
+
+
+class Object(ID):
+
+    def __init__(self, name, data):
+        ID.__init__(self, name)
+        self.data = data
+        if data is None:
+            self.type = 'EMPTY'
+        elif isinstance(data, Camera):
+            self.type = 'CAMERA'
+        else:
+            self.type = 'MESH'
+        self.location = [0.0, 0.0, 0.0]
+        self.rotation_euler = [0.0, 0.0, 0.0]
+        self.scale = [1.0, 1.0, 1.0]
+        self.rotation_mode = 'XYZ'
+        self.parent = None
+        self.constraints = []
+        self.matrix_world = np.identity(4)
+        self.mode = 'OBJECT'
+
+
+class DataCollection(object):
+    """bpy.data.<type>: datablocks by name, iterating over the datablocks."""
+
+    def __init__(self, type):
+        self.type = type
+        self.items = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(list(self.items.values()))
+
+    def __getitem__(self, name):
+        item = self.items.get(name)
+        if item is None or item.name != name:
+            # renamed since it was created
+            item = dict((i.name, i) for i in self.items.values())[name]
+        return item
+
+    def __contains__(self, name):
+        try:
+            self[name]
+        except KeyError:
+            return False
+        return True
+
+    def keys(self):
+        return [item.name for item in self.items.values()]
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def new(self, name, *args):
+        calls['data.%s.new' % self.type.__name__] += 1
+        unique = name
+        n = 0
+        while unique in self.items:
+            n += 1
+            unique = '%s.%03d' % (name, n)
+        item = self.type(unique, *args)
+        self.items[unique] = item
+        return item
+
+    def remove(self, item):
+        for key, value in list(self.items.items()):
+            if value is item:
+                del self.items[key]
+
+
+class Render(object):
+
+    def __init__(self):
+        self.resolution_x = 1920
+        self.resolution_y = 1080
+        self.pixel_aspect_x = 1.0
+        self.pixel_aspect_y = 1.0
+        self.fps = 24
+
+
+class Scene(ID):
+
+    def __init__(self, name):
+        ID.__init__(self, name)
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_current = 1
+        self.render = Render()
+        self.objects = ObjectList()
+        self.camera = None
+
+    def frame_set(self, frame):
+        calls['frame_set'] += 1
+        self.frame_current = frame
+
+
+class Namespace(object):
+
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+class OperatorGroup(object):
+    """bpy.ops.<group>: records calls to operators that aren't emulated."""
+
+    def __init__(self, group, **operators):
+        self.group = group
+        self.__dict__.update(operators)
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        path = 'ops.%s.%s' % (self.group, name)
+
+        def operator(*args, **kwargs):
+            calls[path] += 1
+            return {'FINISHED'}
+        return operator
+
+
+def _camera_add(location=(0, 0, 0), rotation=(0, 0, 0)):
+    calls['ops.object.camera_add'] += 1
+    obj = data.objects.new('Camera', data.cameras.new('Camera'))
+    obj.location = list(location)
+    obj.rotation_euler = list(rotation)
+    context.scene.objects.link(obj)
+    context.active_object = context.object = obj
+    return {'FINISHED'}
+
+
+def _delete():
+    calls['ops.object.delete'] += 1
+    for obj in list(context.scene.objects):
+        context.scene.objects.remove(obj)
+        data.objects.remove(obj)
+    return {'FINISHED'}
+
+
+def reset():
+    """Start over with an empty scene and no recorded calls."""
+    global data, context
+    calls.clear()
+    del reports[:]
+    data = Namespace(
+        objects=DataCollection(Object), cameras=DataCollection(Camera),
+        meshes=DataCollection(Mesh), actions=DataCollection(Action),
+        groups=DataCollection(Group), scenes=DataCollection(Scene),
+        movieclips=DataCollection(ID))
+    scene = data.scenes.new('Scene')
+    context = Namespace(scene=scene, active_object=None, object=None, selected_objects=[])
+
+
+class Operator(object):
+
+    def report(self, type, message):
+        reports.append((type, message))
+
+
+class Menu(object):
+
+    def append(self, func):
+        pass
+
+    def remove(self, func):
+        pass
+
+
+STUB = True
+data = context = None
+reset()
+ops = Namespace(object=OperatorGroup('object', camera_add=_camera_add, delete=_delete),
+                clip=OperatorGroup('clip'), wm=OperatorGroup('wm'))
+types = Namespace(Operator=Operator, Object=Object, INFO_MT_file_import=Menu(),
+                  INFO_MT_file_export=Menu())
+utils = Namespace(register_class=lambda cls: None, unregister_class=lambda cls: None)
+app = Namespace(version=(2, 79, 0), binary_path='', binary_path_python='', background=True)
@@ -0,0 +1,7 @@
+"""Property functions of the bpy stub; class attributes get the default value."""
+
+
+def _property(**options):
+    return options.get('default')
+
+BoolProperty = IntProperty = FloatProperty = FloatVectorProperty = StringProperty = EnumProperty = _property
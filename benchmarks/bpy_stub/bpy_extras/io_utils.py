@@ -0,0 +1,6 @@
+class ImportHelper(object):
+    filepath = ''
+
+
+class ExportHelper(object):
+    filepath = ''
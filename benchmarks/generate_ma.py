@@ -0,0 +1,128 @@
+"""Write synthetic MatchMover style Maya ASCII (.ma) solves.
+
+The files have the layout of sample.ma: resolution, a camera with animated
+translation, rotation and focal length, an image plane, and a tracker group
+with one transform and locator per track. Animated tracks get animCurveTL
+nodes connected to their translation, and long ktv arrays can be wrapped
+over several lines like Maya does.
+
+    python generate_ma.py out.ma --frames 1000 --locators 20000 --animated 100
+"""
+import argparse
+
+import numpy as np
+
+
+def _ktv(frames, values, wrap):
+    """Return the lines of a ktv setAttr, wrapping after wrap keys."""
+    pairs = ['%d %g' % (f, v) for f, v in zip(frames.tolist(), values.tolist())]
+    head = '\tsetAttr -s %d ".ktv[0:%d]"' % (len(pairs), len(pairs) - 1)
+    if not wrap:
+        return [head + ' ' + ' '.join(pairs) + ';']
+    lines = [head]
+    for start in range(0, len(pairs), wrap):
+        lines.append('\t\t ' + ' '.join(pairs[start:start + wrap]))
+    lines[-1] += ';'
+    return lines
+
+
+def write_scene(file, frames=141, locators=2500, animated=0, wrap=0, seed=0):
+    """Write a solve to the text file object; returns {'nodes': ..., 'keys': ...}.
+
+    The first `animated` of the `locators` tracks are animated. wrap is the
+    number of keys per line of the ktv arrays (0 writes them on one line).
+    """
+    rng = np.random.RandomState(seed)
+    time = np.arange(1, frames + 1)
+    stats = {'nodes': 0, 'keys': 0}
+    lines = []
+
+    def write():
+        file.write('\n'.join(lines))
+        file.write('\n')
+        del lines[:]
+
+    def curve(type, name, values, plug):
+        lines.append('createNode %s -n "%s";' % (type, name))
+        lines.extend(_ktv(time, values, wrap))
+        lines.append('connectAttr "%s.o" "%s";' % (name, plug))
+        stats['nodes'] += 1
+        stats['keys'] += frames
+
+    lines.extend([
+        '//Maya ASCII 2010 scene',
+        '//Name: synthetic.ma',
+        '',
+        'requires maya "2010";',
+        'currentUnit -l centimeter -a degree -t film;',
+        'select -ne defaultResolution;',
+        '\tsetAttr ".w" 1920;',
+        '\tsetAttr ".h" 1080;',
+        '\tsetAttr ".dar" 1.77778;',
+        '\tsetAttr ".ldar" yes;',
+        '',
+        'createNode transform -n "rzCamera1";',
+        'createNode camera -n "rzCameraShape1" -p "rzCamera1";',
+        '\tsetAttr ".cap" -type "double2" 1.25984 0.708661;',
+        '\tsetAttr ".ff" 0;',
+        '\tsetAttr ".ncp" 0.00095;',
+        '\tsetAttr ".fcp" 84381.5;',
+        'createNode imagePlane -n "rzImagePlane1";',
+        '\tsetAttr ".imn" -type "string" "C:/footage/plate.0001.png";',
+        '\tsetAttr ".ufe" yes;',
+        'createNode animCurveTU -n "rzImagePlane1_frameExtension";',
+        '\tsetAttr -s 2 ".ktv[0:1]" 1 1 %d %d;' % (frames, frames),
+        'connectAttr "rzImagePlane1_frameExtension.o" "rzImagePlane1.fe";',
+        'connectAttr "rzImagePlane1.msg" "rzCameraShape1.ip" -na;',
+        ])
+    stats['nodes'] += 4
+    stats['keys'] += 2
+    walk = np.cumsum(rng.normal(0, 0.05, (frames, 6)), axis=0)
+    path = walk + (0, 5, 40, 0, 0, 0)
+    curve('animCurveTU', 'rzCamera1_focalLength', np.full(frames, 35.0), 'rzCameraShape1.fl')
+    curve('animCurveTU', 'rzCamera1_visibility', np.ones(frames), 'rzCameraShape1.v')
+    for i, (attr, type) in enumerate((('translateX', 'animCurveTL'), ('translateY', 'animCurveTL'),
+                                      ('translateZ', 'animCurveTL'), ('rotateX', 'animCurveTA'),
+                                      ('rotateY', 'animCurveTA'), ('rotateZ', 'animCurveTA'))):
+        curve(type, 'rzCamera1_' + attr, path[:, i], 'rzCamera1.' + attr)
+    lines.append('createNode transform -n "rzTrackerGroup";')
+    lines.append('createNode transform -n "Auto_Tracks" -p "rzTrackerGroup";')
+    stats['nodes'] += 2
+    write()
+
+    positions = rng.uniform(-50, 50, (locators, 3))
+    for n in range(locators):
+        name = 'rzTracker_Auto%04d' % n
+        lines.append('createNode transform -n "%s" -p "Auto_Tracks";' % name)
+        if n >= animated:
+            lines.append('\tsetAttr ".t" -type "double3" %g %g %g;' % tuple(positions[n]))
+        lines.append('createNode locator -n "%sShape%d" -p "%s";' % (name, n, name))
+        lines.append('\tsetAttr -k off ".v";')
+        stats['nodes'] += 2
+        if n < animated:
+            drift = np.cumsum(rng.normal(0, 0.01, (frames, 3)), axis=0) + positions[n]
+            for i, attr in enumerate(('translateX', 'translateY', 'translateZ')):
+                curve('animCurveTL', '%s_%s' % (name, attr), drift[:, i], '%s.%s' % (name, attr))
+        if len(lines) > 4096:
+            write()
+    lines.append('playbackOptions -min 1 -max %d;' % frames)
+    write()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('output')
+    parser.add_argument('--frames', type=int, default=141)
+    parser.add_argument('--locators', type=int, default=2500)
+    parser.add_argument('--animated', type=int, default=0, help='number of animated tracks')
+    parser.add_argument('--wrap', type=int, default=0, help='keys per line of the ktv arrays')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    with open(args.output, 'w') as file:
+        stats = write_scene(file, args.frames, args.locators, args.animated, args.wrap, args.seed)
+    print('%s: %d nodes, %d keys' % (args.output, stats['nodes'], stats['keys']))
+
+
+if __name__ == '__main__':
+    main()
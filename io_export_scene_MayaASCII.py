@@ -1,8 +1,10 @@
 import bpy
+import numpy as np
 from bpy.props import *
 import os.path
 from bpy_extras.io_utils import ExportHelper
-from math import degrees, radians
+from mayaascii_timing import PhaseTimer, profiled
+from mayaascii_writer import MayaAsciiWriter
 
 bl_info = {
     "name": "Maya ASCII (*.ma) Exporter",
@@ -16,6 +18,110 @@ bl_info = {
     "tracker_url": "",
     "category": "Import-Export"}
 
+def find_fcurve(id_data, data_path, index=0):
+    if index is None:
+        index = 0
+    anim = id_data.animation_data
+    if anim is None or anim.action is None:
+        return None
+    for fcurve in anim.action.fcurves:
+        if fcurve.data_path == data_path and fcurve.array_index == index:
+            return fcurve
+    return None
+
+def is_plain(id_data):
+    """True if id_data's channels are only driven by its action's F-curves."""
+    anim = id_data.animation_data
+    if anim is not None and (len(anim.drivers) or len(anim.nla_tracks)):
+        return False
+    if isinstance(id_data, bpy.types.Object):
+        return (id_data.parent is None and not len(id_data.constraints) and
+                id_data.rotation_mode == 'XYZ')
+    return True
+
+def sample_fcurve(fcurve, frames):
+    """Return the values of fcurve on frames, read straight from its keys if they match."""
+    count = len(fcurve.keyframe_points)
+    if count == len(frames) and not len(fcurve.modifiers):
+        co = np.empty(count*2, dtype=np.float32)
+        fcurve.keyframe_points.foreach_get('co', co)
+        if np.array_equal(co[0::2], frames):
+            return co[1::2].astype(np.float64)
+    return np.array([fcurve.evaluate(frame) for frame in frames])
+
+def sample_channel(id_data, data_path, index, frames):
+    fcurve = find_fcurve(id_data, data_path, index)
+    if fcurve is not None and not fcurve.mute and len(fcurve.keyframe_points):
+        return sample_fcurve(fcurve, frames)
+    value = getattr(id_data, data_path)
+    if index is not None:
+        value = value[index]
+    return np.full(len(frames), value, dtype=np.float64)
+
+def sample_objects(scene, objects, frames, camera=None):
+    """Sample location, rotation and scale of objects on frames.
+
+    Returns a dict mapping object names to (frames, 9) arrays, plus the
+    focal length of camera (or None). Objects whose channels are plain
+    F-curves are read from them directly. Only parented, constrained or
+    driven objects need the scene to be evaluated; their world matrices
+    are collected in one frame_set pass over the range.
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    samples = {}
+    evaluate = []
+    for obj in objects:
+        if is_plain(obj):
+            samples[obj.name] = np.column_stack(
+                [sample_channel(obj, path, i, frames)
+                 for path in ('location', 'rotation_euler', 'scale') for i in range(3)])
+        else:
+            evaluate.append(obj)
+            samples[obj.name] = np.empty((len(frames), 9))
+    lens = None
+    if camera is not None and is_plain(camera.data):
+        lens = sample_channel(camera.data, 'lens', None, frames)
+    elif camera is not None:
+        lens = np.empty(len(frames))
+    if evaluate or (camera is not None and not is_plain(camera.data)):
+        oframe = scene.frame_current
+        previous = {}
+        for f, frame in enumerate(frames):
+            scene.frame_set(int(frame))
+            for obj in evaluate:
+                loc, rot, scale = obj.matrix_world.decompose()
+                euler = rot.to_euler('XYZ', previous[obj.name]) if obj.name in previous else rot.to_euler('XYZ')
+                previous[obj.name] = euler
+                samples[obj.name][f] = tuple(loc) + tuple(euler) + tuple(scale)
+            if camera is not None and not is_plain(camera.data):
+                lens[f] = camera.data.lens
+        scene.frame_set(oframe)
+    return samples, lens
+
+# (attr, curve type, curve name suffix) of the camera transform
+CAMERA_CURVES = (
+    ('tx', 'animCurveTL', '_translateX'),
+    ('ty', 'animCurveTL', '_translateY'),
+    ('tz', 'animCurveTL', '_translateZ'),
+    ('rx', 'animCurveTA', '_rotateX'),
+    ('ry', 'animCurveTA', '_rotateY'),
+    ('rz', 'animCurveTA', '_rotateZ'),
+    )
+
+def maya_channels(samples, sscale):
+    """Convert sampled (frames, 9) Blender loc/rot/scale arrays to Maya tx..sz columns."""
+    channels = np.empty_like(samples)
+    channels[:, 0] = samples[:, 0]*sscale
+    channels[:, 1] = samples[:, 2]*sscale
+    channels[:, 2] = samples[:, 1]*sscale*-1
+    channels[:, 3] = np.degrees(samples[:, 3])-90
+    channels[:, 4] = np.degrees(samples[:, 5])
+    channels[:, 5] = np.degrees(samples[:, 4])
+    channels[:, 6] = samples[:, 6]*sscale
+    channels[:, 7] = samples[:, 8]*sscale
+    channels[:, 8] = samples[:, 7]*sscale
+    return channels
+
 class ExportMayaASCII(bpy.types.Operator, ExportHelper):
     bl_idname = "export.mayaascii"
     bl_label = "Export Maya ASCII (*.ma)"
@@ -24,6 +130,13 @@ class ExportMayaASCII(bpy.types.Operator, ExportHelper):
     sscale = FloatProperty (name ="sscale", default = 1, description="Scene Scale Multiplier")
     enumber = IntProperty (name ="enumber", default = 50, description="Max. Number of Empties to be Exported")
     anim_empties = BoolProperty (name ="anim_empties", default = False, description="Animate Empties")
+    workers = IntProperty (name ="workers", default = 0, min = 0, max = 64, description="Number of Processes Formatting the Empties (0 = no extra processes)")
+    precision = IntProperty (name ="precision", default = 6, min = 1, max = 17, description="Significant Digits of Exported Values")
+    reduce_keys = BoolProperty (name ="reduce_keys", default = False, description="Remove the Keys that Linear Interpolation reproduces within the Tolerances")
+    location_tolerance = FloatProperty (name ="location_tolerance", default = 0.0001, min = 0, precision = 5, description="Max. Deviation of Reduced Translation Curves (Blender Units)")
+    rotation_tolerance = FloatProperty (name ="rotation_tolerance", default = 0.01, min = 0, precision = 3, description="Max. Deviation of Reduced Rotation Curves (Degrees)")
+    lens_tolerance = FloatProperty (name ="lens_tolerance", default = 0.001, min = 0, precision = 3, description="Max. Deviation of Reduced Focal Length, Visibility and Scale Curves")
+    profile = BoolProperty (name ="profile", default = False, description="Profile the Export and write the Stats to <file>_export.prof")
     
     filename_ext = ".ma"
     filter_glob = StringProperty(default="*.ma", options={'HIDDEN'})
@@ -33,7 +146,9 @@ class ExportMayaASCII(bpy.types.Operator, ExportHelper):
         return context.active_object != None and bpy.context.scene.camera != None    
 
     def execute(self, context):
-        self.exportTracking(self.filepath)
+        profile = os.path.splitext(self.filepath)[0] + '_export.prof' if self.profile else None
+        with profiled(profile):
+            self.exportTracking(self.filepath)
         return {'FINISHED'}
         
     def draw(self, context):
@@ -47,9 +162,23 @@ class ExportMayaASCII(bpy.types.Operator, ExportHelper):
         row.prop(self,'enumber','Max. Number of Empties')
         row = col.row()
         row.prop(self,'anim_empties','Animate Empties')
+        row = col.row()
+        row.prop(self,'precision','Precision')
+        row = col.row()
+        row.prop(self,'reduce_keys','Reduce Keys')
+        row = col.row()
+        row.prop(self,'location_tolerance','Location')
+        row.prop(self,'rotation_tolerance','Rotation')
+        row.prop(self,'lens_tolerance','Focal Length')
+        row = col.row()
+        row.prop(self,'workers','Processes')
+        row = col.row()
+        row.prop(self,'profile','Write Profile')
     
     def exportTracking(self, filename):
         print("Exporting...")
+        timer = PhaseTimer()
+        timer.start('setup')
         scene = bpy.context.scene
         try:
             expCamObj = bpy.context.object
@@ -60,263 +189,105 @@ class ExportMayaASCII(bpy.types.Operator, ExportHelper):
         enumber = self.enumber
         sscale = self.sscale*100
         anim_empties = self.anim_empties
-        oframe = scene.frame_current
         start_frame = scene.frame_start
         end_frame = scene.frame_end
         
-        hasmedia = True
-        try:
-            media_start_frame = scene.active_clip.frame_start-1 #starts at one hitfilm expexts 0 based
-            media_end_frame = scene.active_clip.frame_duration #even tho 0 based looks to 1 based last frame in xml so leave
-        except:
-            hasmedia = False
-            media_start_frame = start_frame #starts at one hitfilm expexts 0 based
-            media_end_frame = end_frame #even tho 0 based looks to 1 based last frame in xml so leave  
-        
-        scene.frame_set(scene.frame_start)
-        
-        num_frames = end_frame+1 - start_frame
-        flength = end_frame+1 - start_frame
         res_x = bpy.context.scene.render.resolution_x
         res_y = bpy.context.scene.render.resolution_y
         resasp = res_x/res_y
         aspect = res_x*scene.render.pixel_aspect_x / float(res_y*scene.render.pixel_aspect_y)
         
-        t = {}
-        
-        #header
-        t['header'] = []
-        t['header'].append('//Maya ASCII 2010 scene\n\nrequires maya "2010";\n')
-        
-        #fps
-        if bpy.context.scene.render.fps < 25:
-            fps = 'film'
-        elif bpy.context.scene.render.fps < 30:
-            fps = 'pal'
-        else:
-            fps = 'ntsc'
-        t['header'].append('currentUnit -l centimeter -a degree -t %s;\n'%(fps))
-        
-        #resolution
-        t['header'].append('select -ne defaultResolution;\n')
-        t['header'].append('    setAttr ".w" %s;\n'%(res_x))
-        t['header'].append('    setAttr ".h" %s;\n'%(res_y))
-        t['header'].append('    setAttr ".dar" %s;\n'%(resasp))
-        t['header'].append('    setAttr ".ldar" yes;\n\n')
-        
-        #camera
-        c = 1.25
-        aperturex = min(c,c*aspect)
-        aperturey = min(c,c/aspect)  
-        t['header'].append('createNode transform -n "%s";\n'%(expCamObj.name))
-        t['header'].append('createNode camera -n "%sShape" -p "%s";\n'%(expCamObj.name,expCamObj.name))
-        t['header'].append('    setAttr -k off ".v";\n')
-        t['header'].append('    setAttr ".cap" -type "double2" %s %s;\n'%(aperturex,aperturey))  
-        t['header'].append('    setAttr ".ff" 3;\n')#filmfit
-        #nearClipPlane 0.001(pfhoe reference)
-        t['header'].append('    setAttr ".ncp" %f;\n'%(expCamera.clip_start*sscale))
-        #farClipPlane 1000(pfhoe reference)
-        t['header'].append('    setAttr ".fcp" %f;\n'%(expCamera.clip_end*sscale))
-        #focusDistance 5(pfhoe reference)       
-        t['header'].append('    setAttr ".fd" %f;\n'%(expCamera.dof_distance*sscale))
-        #centerOfInterest 5(pfhoe reference)     
-        t['header'].append('    setAttr ".coi" %f;\n'%(expCamera.dof_distance*sscale))
-        #orthographicWidth 10(pfhoe reference)     
-        t['header'].append('    setAttr ".ow" 10;\n')
-        #displayResolution        
-        t['header'].append('    setAttr ".dr" yes;\n')
-        
         #empties
         tracker=[]
-        tracker_data=[] 
-        
-        idx = 1
         for o in bpy.context.selected_objects:
+            if len(tracker) >= enumber: break
             if o.type=='EMPTY':
                 tracker.append(o)
-                tracker_data.append(['']*9)
-                idx+=1
-            if idx>enumber: break
         
         #animation
-        c_fl =''
-        c_v =''
-        c_tx =''
-        c_ty =''
-        c_tz =''
-        c_rx =''
-        c_ry =''
-        c_rz =''
-        for frame in range(start_frame, end_frame+1):
-            scene.frame_set(frame)
-            obj = expCamObj
+        timer.start('sample')
+        frames = np.arange(start_frame, end_frame+1)
+        if anim_empties:
+            samples, lens = sample_objects(scene, [expCamObj] + tracker, frames, expCamObj)
+        else:
+            samples, lens = sample_objects(scene, [expCamObj], frames, expCamObj)
+            samples.update(sample_objects(scene, tracker, [start_frame])[0])
+        
+        if not filename.endswith('.ma'):
+            filename += '.ma'
+        with open(filename, 'w', buffering=1 << 20) as mafile:
+            timer.start('camera')
+            tolerances = None
+            if self.reduce_keys:
+                tolerances = {'animCurveTL': self.location_tolerance*sscale,
+                              'animCurveTA': self.rotation_tolerance,
+                              'animCurveTU': self.lens_tolerance}
+            ma = MayaAsciiWriter(mafile, self.precision, tolerances)
             
-            x = bpy.data.objects[expCamObj.name].location[0]*sscale
-            y = bpy.data.objects[expCamObj.name].location[2]*sscale
-            z = bpy.data.objects[expCamObj.name].location[1]*sscale*-1
+            #header
+            ma.header('2010')
             
-            rx = degrees(bpy.data.objects[expCamObj.name].rotation_euler[0])-90
-            ry = degrees(-bpy.data.objects[expCamObj.name].rotation_euler[2])*-1
-            rz = degrees(bpy.data.objects[expCamObj.name].rotation_euler[1])
+            #fps
+            if bpy.context.scene.render.fps < 25:
+                fps = 'film'
+            elif bpy.context.scene.render.fps < 30:
+                fps = 'pal'
+            else:
+                fps = 'ntsc'
+            ma.current_unit('centimeter', 'degree', fps)
             
-            c_fl+=(' %s %s'%(frame,expCamera.lens))
-            c_v+=(' %s 1'%(frame))
-            c_tx+=(' %s %s'%(frame,x))
-            c_ty+=(' %s %s'%(frame,y))
-            c_tz+=(' %s %s'%(frame,z))
-            c_rx+=(' %s %s'%(frame,rx))
-            c_ry+=(' %s %s'%(frame,ry))
-            c_rz+=(' %s %s'%(frame,rz))
-            if anim_empties or scene.frame_current == scene.frame_start:
-                idx = 1
-                for o in tracker:
-                    x = bpy.data.objects[o.name].location[0]*sscale
-                    y = bpy.data.objects[o.name].location[2]*sscale
-                    z = bpy.data.objects[o.name].location[1]*sscale*-1
-                    
-                    if anim_empties:
-                        rx = degrees(bpy.data.objects[o.name].rotation_euler[0])-90
-                        ry = degrees(-bpy.data.objects[o.name].rotation_euler[2])*-1
-                        rz = degrees(bpy.data.objects[o.name].rotation_euler[1])
-                    
-                        sx = bpy.data.objects[o.name].scale[0]*sscale
-                        sy = bpy.data.objects[o.name].scale[2]*sscale
-                        sz = bpy.data.objects[o.name].scale[1]*sscale
-                        
-                        tracker_data[idx-1][0]+=(' %s %s'%(frame,x))
-                        tracker_data[idx-1][1]+=(' %s %s'%(frame,y))
-                        tracker_data[idx-1][2]+=(' %s %s'%(frame,z))
-                        tracker_data[idx-1][3]+=(' %s %s'%(frame,rx))
-                        tracker_data[idx-1][4]+=(' %s %s'%(frame,ry))
-                        tracker_data[idx-1][5]+=(' %s %s'%(frame,rz))
-                        tracker_data[idx-1][6]+=(' %s %s'%(frame,sx))
-                        tracker_data[idx-1][7]+=(' %s %s'%(frame,sy))
-                        tracker_data[idx-1][8]+=(' %s %s'%(frame,sz))
-                    else:
-                        tracker_data[idx-1][0]+=(' %s'%(x))
-                        tracker_data[idx-1][1]+=(' %s'%(y))
-                        tracker_data[idx-1][2]+=(' %s'%(z))
-                    idx+=1
-                
-        #camera animation lines   
-        t['anim']=[]
-        t['anim'].append('createNode animCurveTU -n "%s_focalLength";\n'%(expCamObj.name))
-        t['anim'].append('  setAttr -s %s ".ktv[%s:%s]"%s;\n'%(num_frames,start_frame,end_frame,c_fl))
-
-        t['anim'].append('createNode animCurveTU -n "%s_visibility";\n'%(expCamObj.name))
-        t['anim'].append('  setAttr -s %s ".ktv[%s:%s]"%s;\n'%(num_frames,start_frame,end_frame,c_v))
-        
-        t['anim'].append('createNode animCurveTL -n "%s_translateX";\n'%(expCamObj.name))
-        t['anim'].append('  setAttr -s %s ".ktv[%s:%s]"%s;\n'%(num_frames,start_frame,end_frame,c_tx))
+            #resolution
+            ma.select('defaultResolution')
+            ma.set_attr('w', res_x)
+            ma.set_attr('h', res_y)
+            ma.set_attr('dar', resasp)
+            ma.set_attr('ldar', True)
             
-        t['anim'].append('createNode animCurveTL -n "%s_translateY";\n'%(expCamObj.name))
-        t['anim'].append('  setAttr -s %s ".ktv[%s:%s]"%s;\n'%(num_frames,start_frame,end_frame,c_ty)) #invert
-                
-        t['anim'].append('createNode animCurveTL -n "%s_translateZ";\n'%(expCamObj.name))
-        t['anim'].append('  setAttr -s %s ".ktv[%s:%s]"%s;\n'%(num_frames,start_frame,end_frame,c_tz))
-        
-        t['anim'].append('createNode animCurveTA -n "%s_rotateX";\n'%(expCamObj.name))
-        t['anim'].append('  setAttr -s %s ".ktv[%s:%s]"%s;\n'%(num_frames,start_frame,end_frame,c_rx))
-        
-        t['anim'].append('createNode animCurveTA -n "%s_rotateY";\n'%(expCamObj.name))
-        t['anim'].append('  setAttr -s %s ".ktv[%s:%s]"%s;\n'%(num_frames,start_frame,end_frame,c_ry)) #invert
-        
-        t['anim'].append('createNode animCurveTA -n "%s_rotateZ";\n'%(expCamObj.name))
-        t['anim'].append('  setAttr -s %s ".ktv[%s:%s]"%s;\n'%(num_frames,start_frame,end_frame,c_rz))
-        
-        #cam_footer
-        t['cam_footer']=[]
-        t['cam_footer'].append('connectAttr "%s_focalLength.o" "%sShape.fl";\n'%(expCamObj.name,expCamObj.name))
-        t['cam_footer'].append('connectAttr "%s_visibility.o" "%sShape.v";\n'%(expCamObj.name,expCamObj.name))
-        t['cam_footer'].append('connectAttr "%s_translateX.o" "%s.tx";\n'%(expCamObj.name,expCamObj.name))
-        t['cam_footer'].append('connectAttr "%s_translateY.o" "%s.ty";\n'%(expCamObj.name,expCamObj.name))
-        t['cam_footer'].append('connectAttr "%s_translateZ.o" "%s.tz";\n'%(expCamObj.name,expCamObj.name))
-        t['cam_footer'].append('connectAttr "%s_rotateX.o" "%s.rx";\n'%(expCamObj.name,expCamObj.name))
-        t['cam_footer'].append('connectAttr "%s_rotateY.o" "%s.ry";\n'%(expCamObj.name,expCamObj.name))
-        t['cam_footer'].append('connectAttr "%s_rotateZ.o" "%s.rz";\n'%(expCamObj.name,expCamObj.name))
-        
-        #point animation lines
-        t['point'] = [] 
-        idx = 1
-        for o in tracker:
-            t['point'].append('createNode transform -n "Track_%s";\n'%idx)
-            if anim_empties:
-                t['point'].append('createNode locator -n "Point_%s" -p "Track_%s";\n'%(idx,idx))
-                t['point'].append(' setAttr -k off ".v";\n')
-                tracker_data[idx-1][0]+=(' %s %s'%(frame,x))
-                tracker_data[idx-1][1]+=(' %s %s'%(frame,y))
-                tracker_data[idx-1][2]+=(' %s %s'%(frame,z))
-                tracker_data[idx-1][3]+=(' %s %s'%(frame,rx))
-                tracker_data[idx-1][4]+=(' %s %s'%(frame,ry))
-                tracker_data[idx-1][5]+=(' %s %s'%(frame,rz))
-                tracker_data[idx-1][6]+=(' %s %s'%(frame,sx))
-                tracker_data[idx-1][7]+=(' %s %s'%(frame,sy))
-                tracker_data[idx-1][8]+=(' %s %s'%(frame,sz))
-                t['point'].append('createNode animCurveTU -n "Track_%s_tx";\n'%idx)
-                t['point'].append('  setAttr -s %s ".ktv[%s:%s]"%s;\n'%(num_frames,start_frame,end_frame,tracker_data[idx-1][0]))
-                t['point'].append('createNode animCurveTU -n "Track_%s_ty";\n'%idx)
-                t['point'].append('  setAttr -s %s ".ktv[%s:%s]"%s;\n'%(num_frames,start_frame,end_frame,tracker_data[idx-1][1]))
-                t['point'].append('createNode animCurveTU -n "Track_%s_tz";\n'%idx)
-                t['point'].append('  setAttr -s %s ".ktv[%s:%s]"%s;\n'%(num_frames,start_frame,end_frame,tracker_data[idx-1][2]))
-                
-                t['point'].append('createNode animCurveTU -n "Track_%s_rx";\n'%idx)
-                t['point'].append('  setAttr -s %s ".ktv[%s:%s]"%s;\n'%(num_frames,start_frame,end_frame,tracker_data[idx-1][3]))
-                t['point'].append('createNode animCurveTU -n "Track_%s_ry";\n'%idx)
-                t['point'].append('  setAttr -s %s ".ktv[%s:%s]"%s;\n'%(num_frames,start_frame,end_frame,tracker_data[idx-1][4]))
-                t['point'].append('createNode animCurveTU -n "Track_%s_rz";\n')
-                t['point'].append('  setAttr -s %s ".ktv[%s:%s]"%s;\n'%(num_frames,start_frame,end_frame,tracker_data[idx-1][5]))
-                
-                t['point'].append('createNode animCurveTU -n "Track_%s_sx";\n'%idx)
-                t['point'].append('  setAttr -s %s ".ktv[%s:%s]"%s;\n'%(num_frames,start_frame,end_frame,tracker_data[idx-1][6]))
-                t['point'].append('createNode animCurveTU -n "Track_%s_sy";\n'%idx)
-                t['point'].append('  setAttr -s %s ".ktv[%s:%s]"%s;\n'%(num_frames,start_frame,end_frame,tracker_data[idx-1][7]))
-                t['point'].append('createNode animCurveTU -n "Track_%s_sz";\n'%idx)
-                t['point'].append('  setAttr -s %s ".ktv[%s:%s]"%s;\n'%(num_frames,start_frame,end_frame,tracker_data[idx-1][8]))
-                
-                t['point'].append('connectAttr "Track_%s_tx.o" "Track_%s.tx";\n'%(idx,idx))
-                t['point'].append('connectAttr "Track_%s_ty.o" "Track_%s.ty";\n'%(idx,idx))
-                t['point'].append('connectAttr "Track_%s_tz.o" "Track_%s.tz";\n'%(idx,idx))
-                
-                t['point'].append('connectAttr "Track_%s_rx.o" "Track_%s.rx";\n'%(idx,idx))
-                t['point'].append('connectAttr "Track_%s_ry.o" "Track_%s.ry";\n'%(idx,idx))
-                t['point'].append('connectAttr "Track_%s_rz.o" "Track_%s.rz";\n'%(idx,idx))
-                
-                t['point'].append('connectAttr "Track_%s_sx.o" "Track_%s.sx";\n'%(idx,idx))
-                t['point'].append('connectAttr "Track_%s_sy.o" "Track_%s.sy";\n'%(idx,idx))
-                t['point'].append('connectAttr "Track_%s_sz.o" "Track_%s.sz";\n'%(idx,idx))
-            else:
-                t['point'].append(' setAttr ".t" -type "double3" %s %s %s;\n'%(tracker_data[idx-1][0],tracker_data[idx-1][1],tracker_data[idx-1][2]))
-                t['point'].append('createNode locator -n "Point_%s" -p "Track_%s";\n'%(idx,idx))
-                t['point'].append(' setAttr -k off ".v";\n')
-            idx+=1
-        
-        #footer
-        t['footer']=[]
-        t['footer'].append('playbackOptions -min %s -max %s;\n'%(start_frame,end_frame))
-        
-        #write
-        if not filename.endswith('.ma'):
-            filename += '.ma'
-        mafile = open(filename, 'w')
-        
-        for line in t['header']:
-            mafile.write(line)
-
-        for line in t['anim']:
-            mafile.write(line)      
+            #camera
+            c = 1.25
+            aperturex = min(c,c*aspect)
+            aperturey = min(c,c/aspect)
+            ma.create_node('transform', expCamObj.name)
+            ma.create_node('camera', expCamObj.name+'Shape', expCamObj.name)
+            ma.set_attr('v', flags='-k off')
+            ma.set_attr('cap', aperturex, aperturey, type='double2')
+            ma.set_attr('ff', 3) #filmfit
+            ma.set_attr('ncp', expCamera.clip_start*sscale) #nearClipPlane 0.001(pfhoe reference)
+            ma.set_attr('fcp', expCamera.clip_end*sscale) #farClipPlane 1000(pfhoe reference)
+            ma.set_attr('fd', expCamera.dof_distance*sscale) #focusDistance 5(pfhoe reference)
+            ma.set_attr('coi', expCamera.dof_distance*sscale) #centerOfInterest 5(pfhoe reference)
+            ma.set_attr('ow', 10) #orthographicWidth 10(pfhoe reference)
+            ma.set_attr('dr', True) #displayResolution
             
-        for line in t['cam_footer']:
-            mafile.write(line)  
+            #camera animation
+            channels = maya_channels(samples[expCamObj.name], sscale)
+            ma.anim_curve('animCurveTU', expCamObj.name+'_focalLength', frames, lens)
+            ma.anim_curve('animCurveTU', expCamObj.name+'_visibility', frames, np.ones(len(frames)))
+            for i, (attr, curve_type, suffix) in enumerate(CAMERA_CURVES):
+                ma.anim_curve(curve_type, expCamObj.name+suffix, frames, channels[:, i])
             
-        for line in t['point']:
-            mafile.write(line)  
+            ma.connect_attr(expCamObj.name+'_focalLength.o', expCamObj.name+'Shape.fl')
+            ma.connect_attr(expCamObj.name+'_visibility.o', expCamObj.name+'Shape.v')
+            for attr, curve_type, suffix in CAMERA_CURVES:
+                ma.connect_attr(expCamObj.name+suffix+'.o', expCamObj.name+'.'+attr)
             
-        for line in t['footer']:
-            mafile.write(line)
+            #points
+            timer.start('tracks')
+            if tracker:
+                data = np.array([maya_channels(samples[o.name], sscale) for o in tracker]).reshape(len(tracker), -1, 9)
+                ma.tracks(data, frames, anim_empties, self.workers)
             
-        del t
-        self.report({'INFO'}, 'Successfully exported.')
-        scene.frame_set(oframe)
+            #footer
+            ma.playback_options(start_frame, end_frame)
+            timer.start('finish')
+        timer.stop()
+        timer.count('objects', 1 + len(tracker))
+        timer.count('statements', ma.statements)
+        timer.count('keys', ma.keys_written)
+        if self.reduce_keys:
+            timer.count('keys removed', ma.keys_removed)
+        print(timer.table())
+        self.report({'INFO'}, 'Successfully exported in %s' % timer.summary())
 
 def menu_func(self, context):
     self.layout.operator(ExportMayaASCII.bl_idname, text="Maya ASCII (*.ma)")
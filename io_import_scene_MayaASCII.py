@@ -1,8 +1,19 @@
 import bpy
+import numpy as np
 from bpy.props import *
+import hashlib
 import os.path
+import re
+import time
+import traceback
 from bpy_extras.io_utils import ImportHelper
 from math import degrees, radians
+from mayaascii_parser import ANIM_CURVE_TYPES, NodeIndex
+from mayaascii_cache import SceneCache
+from mayaascii_curves import reduce_keys
+from mayaascii_tracks import TrackTable
+import cProfile
+from mayaascii_timing import PhaseTimer, profiled, write_profile
 
 bl_info = {
     "name": "Maya ASCII (*.ma) Importer",
@@ -16,6 +27,274 @@ bl_info = {
     "tracker_url": "",
     "category": "Import-Export"}
 
+# index of a keyframe interpolation in its enum, for foreach_set
+INTERPOLATION_INDEX = {'CONSTANT': 0, 'LINEAR': 1, 'BEZIER': 2}
+
+def add_fcurve(id_data, data_path, index, frames, values, group='', interpolation=None):
+    """Create the F-curve for data_path[index] on id_data with all keys at once.
+
+    Replaces an existing curve for the same channel. The points are
+    allocated in one go and filled with foreach_set, which avoids the
+    per-key cost of keyframe_insert and any frame_set calls.
+    """
+    anim = id_data.animation_data
+    if anim is None:
+        anim = id_data.animation_data_create()
+    if anim.action is None:
+        anim.action = bpy.data.actions.new(id_data.name + 'Action')
+    fcurves = anim.action.fcurves
+    remove_fcurve(id_data, data_path, index)
+    fcurve = fcurves.new(data_path, index=index, action_group=group)
+    co = np.empty((len(frames), 2), dtype=np.float32)
+    co[:, 0] = frames
+    co[:, 1] = values
+    fcurve.keyframe_points.add(len(co))
+    fcurve.keyframe_points.foreach_set('co', co.ravel())
+    if interpolation is not None:
+        modes = np.full(len(co), INTERPOLATION_INDEX[interpolation], dtype=np.int32)
+        fcurve.keyframe_points.foreach_set('interpolation', modes)
+    fcurve.update()
+    return fcurve
+
+def remove_fcurve(id_data, data_path, index):
+    """Remove the F-curve of data_path[index] from id_data's action; returns whether there was one."""
+    anim = id_data.animation_data
+    if anim is None or anim.action is None:
+        return False
+    fcurves = anim.action.fcurves
+    for fcurve in fcurves:
+        if fcurve.data_path == data_path and fcurve.array_index == index:
+            fcurves.remove(fcurve)
+            return True
+    return False
+
+def channel_changed(id_data, key, *arrays):
+    """Return whether the data imported for key differs from the last import onto id_data.
+
+    A digest of every imported channel is kept in the 'mayaascii_sync'
+    property of id_data and replaced when the data changed. Sync imports
+    use it to leave channels the new solve didn't change, and any edits
+    made to them since, alone.
+    """
+    digest = hashlib.md5()
+    for array in arrays:
+        digest.update(np.ascontiguousarray(array, dtype=np.float32).tobytes())
+    digest = digest.hexdigest()
+    if 'mayaascii_sync' not in id_data:
+        id_data['mayaascii_sync'] = {}
+    digests = id_data['mayaascii_sync']
+    if digests.get(key) == digest:
+        return False
+    digests[key] = digest
+    return True
+
+def sync_fcurve(id_data, data_path, index, frames, values, group='', interpolation=None):
+    """add_fcurve, unless the keys are the same as the last import's (see channel_changed)."""
+    if not channel_changed(id_data, '%s[%d]' % (data_path, index), frames, values):
+        return None
+    return add_fcurve(id_data, data_path, index, frames, values, group, interpolation)
+
+def remove_synced_fcurve(id_data, data_path, index):
+    """Remove the F-curve an earlier import wrote for data_path[index], with its digest.
+
+    Returns whether there was one. Curves the import didn't write (no
+    digest, see channel_changed) are left alone.
+    """
+    key = '%s[%d]' % (data_path, index)
+    digests = id_data.get('mayaascii_sync')
+    if digests is None or key not in digests:
+        return False
+    del digests[key]
+    return remove_fcurve(id_data, data_path, index)
+
+def sync_value(id_data, data_path, index, value):
+    """Set a static data_path[index] unless it is the same as the last import's.
+
+    A curve an earlier import wrote for the channel, when it was still
+    animated, is removed first, or it would override the value on playback.
+    """
+    removed = remove_synced_fcurve(id_data, data_path, index)
+    changed = channel_changed(id_data, '%s[%d] static' % (data_path, index), value)
+    if not (changed or removed):
+        return False
+    prop = getattr(id_data, data_path)
+    if hasattr(prop, '__setitem__'):
+        prop[index] = value
+    else:
+        setattr(id_data, data_path, value)
+    return True
+
+def new_track_group(scene, name):
+    """Return a new group (collection in Blender 2.8+) for the track empties."""
+    if hasattr(bpy.data, 'groups'):
+        return bpy.data.groups.new(name)
+    collection = bpy.data.collections.new(name)
+    scene.collection.children.link(collection)
+    return collection
+
+def find_track_group(name):
+    groups = bpy.data.groups if hasattr(bpy.data, 'groups') else bpy.data.collections
+    return groups.get(name)
+
+def numbered_objects(prefix):
+    """Return {track number: object} of the objects named <prefix>.<number>."""
+    pattern = re.compile(re.escape(prefix) + r'\.(\d+)$')
+    objects = {}
+    for obj in bpy.data.objects:
+        match = pattern.match(obj.name)
+        if match:
+            objects[int(match.group(1))] = obj
+    return objects
+
+def remove_object(scene, obj):
+    if hasattr(scene.objects, 'unlink') and obj.name in scene.objects:
+        scene.objects.unlink(obj)
+    for group in list(getattr(obj, 'users_group', ())):
+        group.objects.unlink(obj)
+    bpy.data.objects.remove(obj)
+
+def add_empties(scene, group, tracks):
+    """Create one plain axes empty per (name, location) in tracks.
+
+    The objects are made with bpy.data and linked straight into the scene
+    and group, so the cost doesn't grow with the number of objects already
+    in the scene the way it does with bpy.ops.object.empty_add.
+    """
+    objects = []
+    for name, location in tracks:
+        obj = bpy.data.objects.new(name, None)
+        obj.location = location
+        link_object(scene, group, obj)
+        objects.append(obj)
+    return objects
+
+def link_object(scene, group, obj):
+    if hasattr(scene.objects, 'link'):
+        scene.objects.link(obj)
+    group.objects.link(obj)
+
+def add_point_cloud(scene, group, name, ids, names, locations):
+    """Create a single mesh object with one vertex per track (see point_cloud_mesh)."""
+    obj = bpy.data.objects.new(name, point_cloud_mesh(name, ids, names, locations))
+    link_object(scene, group, obj)
+    return obj
+
+def point_cloud_mesh(name, ids, names, locations):
+    """Create a mesh with one vertex per track.
+
+    All positions are written with one foreach_set call. The track numbers
+    are stored in the integer vertex layer 'track_id' and, where the
+    Blender version has string vertex layers, the names in 'track_name'.
+    """
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(locations))
+    mesh.vertices.foreach_set('co', np.asarray(locations, dtype=np.float32).ravel())
+    if hasattr(mesh, 'vertex_layers_int'):
+        mesh.vertex_layers_int.new('track_id').data.foreach_set('value', ids)
+        for item, track_name in zip(mesh.vertex_layers_string.new('track_name').data, names):
+            item.value = track_name.encode('utf-8')
+    else:
+        mesh.attributes.new('track_id', 'INT', 'POINT').data.foreach_set('value', ids)
+    mesh.update()
+    return mesh
+
+def point_cloud_tracks(obj, selected_only=True):
+    """Return the (name, world location) of the (selected) points of a track point cloud."""
+    mesh = obj.data
+    count = len(mesh.vertices)
+    co = np.empty(count*3, dtype=np.float32)
+    mesh.vertices.foreach_get('co', co)
+    select = np.empty(count, dtype=bool)
+    mesh.vertices.foreach_get('select', select)
+    if not selected_only:
+        select[:] = True
+    ids = np.empty(count, dtype=np.int32)
+    if hasattr(mesh, 'vertex_layers_int'):
+        mesh.vertex_layers_int['track_id'].data.foreach_get('value', ids)
+    else:
+        mesh.attributes['track_id'].data.foreach_get('value', ids)
+    names = None
+    if hasattr(mesh, 'vertex_layers_string') and 'track_name' in mesh.vertex_layers_string:
+        names = mesh.vertex_layers_string['track_name'].data
+    prefix = obj.get('mayaascii_ename', 'Track')
+    matrix = np.array(obj.matrix_world)
+    co = np.dot(co.reshape(-1, 3), matrix[:3, :3].T) + matrix[:3, 3]
+    tracks = []
+    for i in np.flatnonzero(select):
+        if names is not None:
+            name = names[i].value.decode('utf-8')
+        else:
+            name = prefix + '.' + str(ids[i]).zfill(4)
+        tracks.append((name, co[i].tolist()))
+    return tracks
+
+# tracks handled between two progress updates of importSteps
+TRACK_BATCH = 500
+
+# bpy.data collections an import adds to, in the order they are cleaned up
+ROLLBACK_DATA = ('groups', 'collections', 'objects', 'meshes', 'cameras', 'actions', 'movieclips')
+
+def data_snapshot(scene):
+    """Record the datablocks and scene settings an import can change, for rollback()."""
+    names = dict((attr, set(getattr(bpy.data, attr).keys())) for attr in ROLLBACK_DATA
+                 if hasattr(bpy.data, attr))
+    settings = (scene.camera, scene.frame_start, scene.frame_end, scene.frame_current,
+                scene.render.fps, scene.render.resolution_x, scene.render.resolution_y)
+    return names, settings
+
+def rollback(scene, snapshot):
+    """Remove the datablocks created since data_snapshot and restore the scene settings."""
+    names, settings = snapshot
+    for attr, before in names.items():
+        collection = getattr(bpy.data, attr)
+        for name in set(collection.keys()) - before:
+            item = collection[name]
+            if attr == 'objects' and hasattr(scene.objects, 'unlink') and name in scene.objects:
+                scene.objects.unlink(item)
+            collection.remove(item)
+    camera, scene.frame_start, scene.frame_end, frame, scene.render.fps, \
+        scene.render.resolution_x, scene.render.resolution_y = settings
+    try:
+        scene.camera = camera
+    except ReferenceError:
+        # deleted by Clear Scene
+        scene.camera = None
+    scene.frame_set(frame)
+
+def camera_animated(mscene, camshape):
+    """True if the transform or focal length of camshape has more than one key."""
+    camname = (mscene.node(camshape.parent) or camshape).name
+    curves = [mscene.source(camshape.name+'.fl') or mscene.node(camname+'_focalLength')]
+    for plug, suffix in (('.tx', '_translateX'), ('.ty', '_translateY'), ('.tz', '_translateZ'),
+                         ('.rx', '_rotateX'), ('.ry', '_rotateY'), ('.rz', '_rotateZ')):
+        curves.append(mscene.source(camname+plug) or mscene.node(camname+suffix))
+    return any(curve is not None and len(curve.keys()) > 1 for curve in curves)
+
+_indices = {}
+
+def file_index(filename, scan=True):
+    """Return the NodeIndex of filename, reusing it while the file is unchanged.
+
+    Without scan, None is returned instead of indexing a new or changed file.
+    """
+    stat = os.stat(filename)
+    index = _indices.get(filename)
+    if index is None or index.size != stat.st_size or index.mtime != stat.st_mtime:
+        if not scan:
+            return None
+        index = NodeIndex(filename)
+        _indices.clear()
+        _indices[filename] = index
+    return index
+
+def file_summary(filename, scan=True):
+    index = file_index(filename, scan)
+    if index is None:
+        return None
+    if not hasattr(index, 'info'):
+        index.info = index.summary()
+    return index.info
+
 class ImportMayaASCII(bpy.types.Operator, ImportHelper):
     bl_idname = "import.mayaascii"
     bl_label = "Import Maya ASCII (*.ma)"
@@ -25,6 +304,13 @@ class ImportMayaASCII(bpy.types.Operator, ImportHelper):
     sscale = FloatProperty (name ="sscale", default = 1, description="Scene Scale Multiplier")
     egroup = StringProperty (name ="egroup", default = "Tracks", description="Name of the Group Created for Imported Empties")
     ename = StringProperty (name ="ename", default = "Track", description="Name (Prefix) for Imported Empties")
+    track_mode = EnumProperty(
+        name="Tracks",
+        description="How the tracks are imported",
+        items=(('EMPTIES', "Empties", "One empty per track"),
+               ('POINTS', "Point Cloud", "A single mesh with one vertex per track")),
+        default='EMPTIES',
+        )
     include_empties = BoolProperty(
         name="Empties",
         description="Import Empties",
@@ -35,6 +321,16 @@ class ImportMayaASCII(bpy.types.Operator, ImportHelper):
         description="Import Camera",
         default=True,
         )
+    all_cameras = BoolProperty(
+        name="All Cameras",
+        description="Import every camera in the file, not only the first one.",
+        default=True,
+        )
+    active_camera = StringProperty(
+        name="Scene Camera",
+        description="Name of the imported camera that becomes the scene camera (the first animated one if empty).",
+        default="",
+        )
     include_bg = BoolProperty(
         name="BGClip",
         description="Import Movie Clip",
@@ -45,6 +341,14 @@ class ImportMayaASCII(bpy.types.Operator, ImportHelper):
         description="Use keyframes on the focallength.",
         default=False,
         )
+    reduce_keys = BoolProperty(
+        name="Reduce Keys",
+        description="Remove the keys that linear interpolation reproduces within the tolerances; constant channels keep a single key.",
+        default=False,
+        )
+    location_tolerance = FloatProperty (name ="location_tolerance", default = 0.0001, min = 0, precision = 5, description="Max. Deviation of Reduced Location Curves (Blender Units)")
+    rotation_tolerance = FloatProperty (name ="rotation_tolerance", default = 0.01, min = 0, precision = 3, description="Max. Deviation of Reduced Rotation Curves (Degrees)")
+    lens_tolerance = FloatProperty (name ="lens_tolerance", default = 0.001, min = 0, precision = 3, description="Max. Deviation of Reduced Focal Length Curves (mm)")
     flip_taxis = BoolProperty(
         name="Translation",
         description="Flip Z/Y Translation Axis",
@@ -85,43 +389,152 @@ class ImportMayaASCII(bpy.types.Operator, ImportHelper):
         description="Invert Z Rotation",
         default=False,
         )
+    use_frame_range = BoolProperty(
+        name="Frame Range",
+        description="Only import the keys between Start and End; the rest of each curve isn't decoded.",
+        default=False,
+        )
+    range_start = IntProperty(name="Start", default=1, description="First frame to import")
+    range_end = IntProperty(name="End", default=250, description="Last frame to import")
+    shift_frames = BoolProperty(
+        name="Start at Frame 1",
+        description="Move the imported keys and the scene range so the range starts at frame 1.",
+        default=False,
+        )
     clear_scene = BoolProperty(
         name="Clear Scene",
         description="Delete every object in the scene, before importing.",
         default=False,
         )
+    sync = BoolProperty(
+        name="Sync",
+        description="Update the camera and the <Name>.<number> empties already in the scene instead of creating new ones. Only the channels that changed since the last import are rewritten.",
+        default=False,
+        )
+    remove_missing = BoolProperty(
+        name="Remove Missing",
+        description="When syncing, delete the empties of tracks that are no longer imported.",
+        default=False,
+        )
+    use_bounds = BoolProperty(
+        name="Bounding Box",
+        description="Only import the tracks inside the box from Min to Max (in Blender coordinates, after scaling).",
+        default=False,
+        )
+    bounds_min = FloatVectorProperty(name="Min", size=3, default=(-100.0, -100.0, -100.0), description="Lower Corner of the Track Bounding Box")
+    bounds_max = FloatVectorProperty(name="Max", size=3, default=(100.0, 100.0, 100.0), description="Upper Corner of the Track Bounding Box")
+    thin_tracks = EnumProperty(
+        name="Thin Tracks",
+        description="Reduce dense or duplicated tracks by their position (the first key of animated tracks)",
+        items=(('NONE', "None", "Import the first tracks up to the maximum number"),
+               ('MERGE', "Merge Close", "Import one track of every group closer than the merge distance"),
+               ('SAMPLE', "Even Sample", "Import the maximum number of tracks, spread evenly over the whole solve")),
+        default='NONE',
+        )
+    merge_distance = FloatProperty(name="Merge Distance", default=0.01, min=0.0, description="Tracks closer than this (in Blender units, after scaling) are merged")
     imported_tracknumbers = BoolProperty(
         name="Use Track Numbers Defined in File",
         description="Use the track numbers defined in the Maya ASCII file for counting and naming the according empties.",
         default=False,
         )
+    use_cache = BoolProperty(
+        name="Use Cache",
+        description="Keep the parsed file in a cache, so re-importing it (or changing settings in the redo panel) skips parsing.",
+        default=True,
+        )
+    parse_workers = IntProperty (name ="parse_workers", default = 0, min = 0, max = 64, description="Number of Processes Parsing Large Files in Chunks (0 = no extra processes)")
+    profile = BoolProperty(
+        name="Write Profile",
+        description="Profile the import and write the stats to <file>_import.prof next to the .ma file.",
+        default=False,
+        )
     xadd = FloatProperty (name ="xadd", default = 90, description="X Rotation Offset (Eulers)")
     yadd = FloatProperty (name ="yadd", default = 0, description="Y Rotation Offset (Eulers)")
     zadd = FloatProperty (name ="zadd", default = 0, description="Z Rotation Offset (Eulers)")
     
+    show_summary = BoolProperty(
+        name="File Summary",
+        description="Scan the selected file for its cameras, tracks and frame range (takes a while for large files).",
+        default=False,
+        )
+    
     filename_ext = ".ma"
     filter_glob = StringProperty(default="*.ma", options={'HIDDEN'})
     
     def execute(self, context):
-        self.importTracking(self.filepath)
+        error = self.frameRangeError()
+        if error is not None:
+            self.report({'ERROR'}, error)
+            return {'CANCELLED'}
+        profile = os.path.splitext(self.filepath)[0] + '_import.prof' if self.profile else None
+        with profiled(profile):
+            self.importTracking(self.filepath)
         return {'FINISHED'}
         
     def draw(self, context):
         layout = self.layout
         col = layout.column(align=True)
         row = col.row()
+        row.prop(self, 'show_summary')
+        if os.path.isfile(self.filepath):
+            # the file browser redraws often, only files indexed already or
+            # asked for are scanned here
+            try:
+                info = file_summary(self.filepath, self.show_summary)
+            except Exception:
+                info = None
+            if info is not None:
+                row = col.row()
+                row.label('Cameras: %d  Tracks: %d' % (info['cameras'], info['tracks']))
+                if info['cameras'] > 1:
+                    row = col.row()
+                    row.label(', '.join(info['camera_names']))
+                if info['frame_range'] is not None:
+                    row = col.row()
+                    row.label('Frames: %d - %d' % info['frame_range'])
+                row = col.row()
+                row.separator()
+        row = col.row()
         row.label('Include:')
         row = col.row()
         row.prop(self, 'clear_scene')
         row = col.row()
+        row.prop(self, 'sync')
+        row.prop(self, 'remove_missing')
+        row = col.row()
+        row.prop(self, 'use_cache')
+        row.prop(self, 'profile')
+        row = col.row()
+        row.prop(self,'parse_workers','Parse Processes')
+        row = col.row()
         row.prop(self, 'include_camera')
         row.prop(self, 'include_empties')
         row.prop(self, 'include_bg')
         row = col.row()
+        row.prop(self, 'all_cameras')
+        row = col.row()
+        row.prop(self, 'active_camera')
+        row = col.row()
         row.prop(self, 'var_fl')
         row = col.row()
         row.separator()
         row = col.row()
+        row.prop(self, 'reduce_keys')
+        row = col.row()
+        row.prop(self,'location_tolerance','Location')
+        row.prop(self,'rotation_tolerance','Rotation')
+        row.prop(self,'lens_tolerance','Focal Length')
+        row = col.row()
+        row.separator()
+        row = col.row()
+        row.prop(self, 'use_frame_range')
+        row.prop(self, 'shift_frames')
+        row = col.row()
+        row.prop(self, 'range_start')
+        row.prop(self, 'range_end')
+        row = col.row()
+        row.separator()
+        row = col.row()
         row.prop(self,'sscale','Scene Scale')
         row = col.row()
         row.separator()
@@ -130,12 +543,25 @@ class ImportMayaASCII(bpy.types.Operator, ImportHelper):
         row = col.row()
         row.prop(self, 'imported_tracknumbers')
         row = col.row()
+        row.prop(self, 'use_bounds')
+        row = col.row()
+        row.prop(self, 'bounds_min')
+        row = col.row()
+        row.prop(self, 'bounds_max')
+        row = col.row()
+        row.prop(self, 'thin_tracks')
+        if self.thin_tracks == 'MERGE':
+            row = col.row()
+            row.prop(self, 'merge_distance')
+        row = col.row()
         row.separator()
         row = col.row()
         row.prop(self,'egroup','Group')
         row = col.row()
         row.prop(self,'ename','Name')
         row = col.row()
+        row.prop(self, 'track_mode', expand=True)
+        row = col.row()
         row.separator()
         row = col.row()
         row.label('Flip Axis:')
@@ -167,26 +593,87 @@ class ImportMayaASCII(bpy.types.Operator, ImportHelper):
         row.prop(self,'yadd','Y')
         row.prop(self,'zadd','Z')
     
+    def frameRange(self):
+        """Return the (first, last) frame to import, None for every key."""
+        if not self.use_frame_range:
+            return None
+        return (self.range_start, max(self.range_start, self.range_end))
+    
+    def frameRangeError(self):
+        """Return why the requested frame range can't be imported, or None."""
+        if not self.use_frame_range:
+            return None
+        if self.range_end < self.range_start:
+            return 'The frame range ends (%d) before it starts (%d).' % (self.range_end, self.range_start)
+        try:
+            frames = file_summary(self.filepath)['frame_range']
+        except Exception:
+            # unreadable files fail in the import itself
+            return None
+        if frames is not None and (self.range_start > frames[1] or self.range_end < frames[0]):
+            return 'Frames %d - %d are outside the frames of the file (%d - %d).' % (
+                self.range_start, self.range_end, frames[0], frames[1])
+        return None
+    
+    def parseScene(self, filename):
+        want_camera = self.include_camera or self.include_bg
+        frame_range = self.frameRange()
+        
+        def parse():
+            index = file_index(filename)
+            types = set()
+            names = set(e[3] for e in index.nodes() if e[3] and e[3].endswith('_frameExtension'))
+            if want_camera:
+                types.update(('camera', 'imagePlane') + ANIM_CURVE_TYPES)
+                names.update(e[4] for e in index.nodes('camera') if not e[5])
+            if self.include_empties:
+                types.update(('locator',) + ANIM_CURVE_TYPES)
+                names.update(e[4] for e in index.nodes('locator'))
+            return index.parse(types, names, frame_range=frame_range, workers=self.parse_workers)
+        
+        if not self.use_cache:
+            return parse()
+        return SceneCache().load(filename, parse, (want_camera, self.include_empties, frame_range))
+    
     def importTracking(self, filename):
+        for progress in self.importSteps(filename):
+            pass
+    
+    def importSteps(self, filename, timer=None):
+        """Import filename step by step, yielding the progress (0-1) in between."""
         print("Importing...")
+        if timer is None:
+            timer = PhaseTimer()
+        timer.start('setup')
         include_camera = self.include_camera
         include_empties = self.include_empties
         include_bg = self.include_bg
         enumber = self.enumber
-        newCamera = bpy.context.active_object
-        clipname = ""
-        camname = ""
-        trackn = 0
         scene = bpy.context.scene
         oframe = scene.frame_current
         framesSet = False
+        frame_range = self.frameRange()
+        frame_offset = 0
+        if frame_range is not None and self.shift_frames:
+            frame_offset = 1 - frame_range[0]
+        
+        def write_curve(id_data, data_path, axis, frames, values, tolerance, group=''):
+            count = len(frames)
+            interpolation = None
+            if self.reduce_keys:
+                frames, values = reduce_keys(frames, values, tolerance)
+                interpolation = 'LINEAR'
+            if sync_fcurve(id_data, data_path, axis, frames, values, group, interpolation):
+                timer.count('keys', len(frames))
+                if self.reduce_keys:
+                    timer.count('keys removed', count - len(frames))
+            else:
+                timer.count('unchanged')
         
         if self.clear_scene:
             bpy.ops.object.select_all(action = 'SELECT')
             bpy.ops.object.delete()
         
-        if include_empties:
-            bpy.ops.group.create(name=self.egroup)
             
         invert_x=self.sscale
         invert_y=self.sscale
@@ -237,216 +724,373 @@ class ImportMayaASCII(bpy.types.Operator, ImportHelper):
             ryaxis = 1
             rzaxis = 2
         
-        mode = 0
-        file = open(filename, 'r')
-        for line in file:
-            words = line.split()
-            if len(words) == 0 or words[0].startswith('//'):
-                pass
-            
-            elif mode == 0 and words[0] == 'currentUnit' and words[1] == '-l' and words[3] == '-a' and words[5] == '-t':
-                if words[2] == 'centimeter':
-                    invert_x=invert_x*0.01
-                    invert_y=invert_y*0.01
-                    invert_z=invert_z*0.01
-                if words[6] == 'film':
-                    bpy.context.scene.render.fps = 24
-                elif words[6] == 'pal':
-                    bpy.context.scene.render.fps = 25
-                elif words[6] == 'ntsc':
-                    bpy.context.scene.render.fps = 30
-            
-            elif mode == 0 and words[0] == 'select' and words[1] == '-ne' and words[2] == 'defaultResolution;': #get Resolution
-                mode = -2
-            
-            elif mode < 0 and words[0] == 'setAttr' and words[1] == '".w"': #get Width
-                bpy.context.scene.render.resolution_x = int((words[2])[:-1])
-                mode = mode + 1
-            
-            elif mode < 0 and words[0] == 'setAttr' and words[1] == '".h"': #get Height
-                bpy.context.scene.render.resolution_y = int((words[2])[:-1])
-                mode = mode + 1
-                                
-            elif mode == 0 and words[0] == 'createNode' and words[1] == 'camera' and words[2] == '-n' and words[4] == '-p': #create Camera
-                if include_camera:
-                    camname = words[5]
-                    camname = camname[1:-2]
+        yield 0.0
+        timer.start('parse')
+        mscene = self.parseScene(filename)
+        timer.count('lines', mscene.lines)
+        timer.count('statements', mscene.statements)
+        yield 0.2
+        timer.start('camera')
+        
+        if mscene.unit_scale != 1.0:
+            invert_x=invert_x*mscene.unit_scale
+            invert_y=invert_y*mscene.unit_scale
+            invert_z=invert_z*mscene.unit_scale
+        if mscene.fps is not None:
+            scene.render.fps = int(round(mscene.fps))
+        
+        resolution = mscene.node('defaultResolution')
+        if resolution is not None: #get Resolution
+            if resolution.value('w') is not None:
+                scene.render.resolution_x = int(resolution.value('w'))
+            if resolution.value('h') is not None:
+                scene.render.resolution_y = int(resolution.value('h'))
+        
+        # persp, top, front and side are created shared (-s) in every Maya file
+        cameras = mscene.cameras()
+        planes = mscene.nodes_of_type('imagePlane')
+        if not self.all_cameras:
+            cameras = cameras[:1]
+        shots = []
+        for camshape in cameras:
+            # image planes are connected to the camera shape's .ip
+            camplanes = [p for p in mscene.sources(camshape.name+'.ip') if p.type == 'imagePlane']
+            shots.append((camshape, camplanes))
+        if not shots:
+            shots.append((None, []))
+        if planes and not any(camplanes for camshape, camplanes in shots):
+            # no connections, the first image plane belongs to the first camera
+            shots[0] = (shots[0][0], planes[:1])
+        
+        # the scene camera: the one named active_camera, else the first animated one
+        activeShape = shots[0][0]
+        if activeShape is not None:
+            named = [c for c, p in shots if (mscene.node(c.parent) or c).name == self.active_camera]
+            animated = [c for c, p in shots if camera_animated(mscene, c)]
+            activeShape = (named + animated + [activeShape])[0]
+        activeCamera = None
+        for shot, (camshape, camplanes) in enumerate(shots):
+            newCamera = None
+            camname = ""
+            if include_camera and camshape is not None: #create Camera
+                camtransform = mscene.node(camshape.parent) or camshape
+                camname = camtransform.name
+                newCamera = bpy.data.objects.get(camname) if self.sync else None
+                if newCamera is None or newCamera.type != 'CAMERA':
                     bpy.ops.object.camera_add(location=(0, 0, 0), rotation=(0, 0, 0))
                     newCamera = bpy.context.active_object
                     newCamera.name = camname
-                    bpy.context.scene.camera = newCamera
-                
-            elif mode == 0 and words[0] == 'createNode' and words[1] == 'imagePlane' and words[2] == '-n': #get Clipname
-                if include_bg:
-                    clipname = words[3]
-                    clipname = clipname[1:-2]
-                mode = 1
-                
-            elif mode == 1 and words[0] == 'setAttr' and words[1] == '".imn"' and words[2] == '-type' and words[3] == '"string"': #get Clipfile
-                if include_bg:
+                    timer.count('objects')
+                if camshape is activeShape:
+                    activeCamera = newCamera
+            
+            clipname = ""
+            if camplanes: #get Clipname
+                clipname = camplanes[0].name
+                clippath = camplanes[0].value('imn')
+                if self.sync and clippath and os.path.basename(clippath) in bpy.data.movieclips:
+                    # already loaded by the last import
+                    clippath = None
+                if include_bg and clippath: #get Clipfile
+                    timer.start('clip')
                     try:
-                        clippath = line[32:-3]
                         clipfile = os.path.basename(clippath)
                         clippath = clippath[:-len(clipfile)]
                         clippath = clippath.replace("/", r"\\")
                         bpy.ops.clip.open(directory=clippath, files=[{"name":clipname, "name":clipfile}])
                     except:
                         print("Unable to load bg clip.")
-                    
-                mode = 0
+                    timer.start('camera')
+            
+            curve = mscene.source(clipname+'.fe') or mscene.node(clipname+'_frameExtension')
+            if curve is not None and len(curve.keys()): #get Start and Endframe
+                keys = curve.keys()
+                first, last = keys[0, 0], keys[-1, 0]
+                if frame_range is not None and mscene.playback_range is not None:
+                    # the clip's few keys were trimmed to the range, it runs through it
+                    first = max(frame_range[0], mscene.playback_range[0])
+                    last = min(frame_range[1], mscene.playback_range[1])
+                camrange = [int(first + frame_offset), int(last + frame_offset)]
+                if newCamera is not None:
+                    newCamera['mayaascii_frame_range'] = camrange
+                # the scene gets the frame range of the scene camera
+                if not framesSet or (newCamera is not None and newCamera is activeCamera):
+                    scene.frame_start, scene.frame_end = camrange
+                    framesSet = True
             
-            elif mode == 0 and words[0] == 'createNode' and words[1] == 'animCurveTU' and words[2] == '-n' and words[3] == '"'+clipname+'_frameExtension";':
-                mode = 2
-                
-            elif mode == 2 and words[0] == 'setAttr' and words[1] == '-s' and words[2] == '2' and words[3] == '".ktv[0:1]"': #get Start and Endframe
-                scene.frame_start = int(words[4])
-                scene.frame_end = int(words[6])
-                framesSet = True
-                mode = 0
-                
-            elif mode == 0 and words[0] == 'createNode' and words[1] == 'animCurveTU' and words[2] == '-n' and words[3] == '"'+camname+'_focalLength";':
-                if include_camera:
-                    mode = 3
+            if newCamera is None:
+                continue
             
-            elif mode == 3 and words[0] == 'setAttr' and words[1] == '-s': #get Focal Length
+            # curves are found through their connections, by name for files without them
+            curve = mscene.source(camshape.name+'.fl') or mscene.node(camname+'_focalLength')
+            if curve is not None and len(curve.keys()): #get Focal Length
+                keys = curve.keys()
                 if self.var_fl:
-                    for x in range(1, int(float(words[2]))):
-                        bpy.data.cameras[newCamera.data.name].lens = float(words[(x*2)+3])
-                        newCamera.data.keyframe_insert(data_path='lens', frame=x)
-                        scene.frame_set(x)
+                    write_curve(newCamera.data, 'lens', 0, keys[:, 0] + frame_offset, keys[:, 1],
+                                self.lens_tolerance)
                 else:
-                    bpy.data.cameras[newCamera.data.name].lens = float(words[5])
-                
-                mode = 0
-            
-            elif mode == 0 and words[0] == 'createNode' and words[1] == 'animCurveTL' and words[2] == '-n' and words[3] == '"'+camname+'_translateX";':
-                if include_camera:
-                    mode = 4
-            
-            elif mode == 4 and words[0] == 'setAttr' and words[1] == '-s': #get X-Pos
-                for x in range(1, int(float(words[2]))):
-                    bpy.data.objects[newCamera.name].location[txaxis] = float(words[(x*2)+3])*invert_x
-                    newCamera.keyframe_insert(data_path='location', frame=x, index=txaxis)
-                mode = 0
-            
-            elif mode == 0 and words[0] == 'createNode' and words[1] == 'animCurveTL' and words[2] == '-n' and words[3] == '"'+camname+'_translateY";':
-                if include_camera:
-                    mode = 5
-            
-            elif mode == 5 and words[0] == 'setAttr' and words[1] == '-s': #get Y-Pos
-                for x in range(1, int(float(words[2]))):
-                    bpy.data.objects[newCamera.name].location[tyaxis] = float(words[(x*2)+3])*invert_y
-                    newCamera.keyframe_insert(data_path='location', frame=x, index=tyaxis)
-                mode = 0
+                    sync_value(newCamera.data, 'lens', 0, keys[0, 1])
+            elif camshape.value('fl') is not None:
+                sync_value(newCamera.data, 'lens', 0, float(camshape.value('fl')))
             
-            elif mode == 0 and words[0] == 'createNode' and words[1] == 'animCurveTL' and words[2] == '-n' and words[3] == '"'+camname+'_translateZ";':
-                if include_camera:
-                    mode = 6
-            
-            elif mode == 6 and words[0] == 'setAttr' and words[1] == '-s': #get Z-Pos
-                for x in range(1, int(float(words[2]))):
-                    bpy.data.objects[newCamera.name].location[tzaxis] = float(words[(x*2)+3])*invert_z
-                    newCamera.keyframe_insert(data_path='location', frame=x, index=tzaxis)
-                mode = 0
-            
-            elif mode == 0 and words[0] == 'createNode' and words[1] == 'animCurveTA' and words[2] == '-n' and words[3] == '"'+camname+'_rotateX";':
-                if include_camera:
-                    mode = 7
-            
-            elif mode == 7 and words[0] == 'setAttr' and words[1] == '-s': #get X-Rot
-                for x in range(1, int(float(words[2]))):
-                    bpy.data.objects[newCamera.name].rotation_euler[rxaxis] = radians(float(words[(x*2)+3])+self.xadd)*invert_rx
-                    newCamera.keyframe_insert(data_path='rotation_euler', frame=x, index=rxaxis)
-                mode = 0
-            
-            elif mode == 0 and words[0] == 'createNode' and words[1] == 'animCurveTA' and words[2] == '-n' and words[3] == '"'+camname+'_rotateY";':
-                if include_camera:
-                    mode = 8
-            
-            elif mode == 8 and words[0] == 'setAttr' and words[1] == '-s': #get Y-Rot
-                for x in range(1, int(float(words[2]))):
-                    bpy.data.objects[newCamera.name].rotation_euler[ryaxis] = radians(float(words[(x*2)+3])+self.yadd)*invert_ry
-                    newCamera.keyframe_insert(data_path='rotation_euler', frame=x, index=ryaxis)
-                mode = 0
-            
-            elif mode == 0 and words[0] == 'createNode' and words[1] == 'animCurveTA' and words[2] == '-n' and words[3] == '"'+camname+'_rotateZ";':
-                if include_camera:
-                    mode = 9
-            
-            elif mode == 9 and words[0] == 'setAttr' and words[1] == '-s': #get Z-Rot
-                for x in range(1, int(float(words[2]))):
-                    bpy.data.objects[newCamera.name].rotation_euler[rzaxis] = radians(float(words[(x*2)+3])+self.zadd)*invert_rz
-                    newCamera.keyframe_insert(data_path='rotation_euler', frame=x, index=rzaxis)
-                mode = 0
-            
-            elif mode == 0 and words[0] == 'createNode' and words[1] == 'locator' and words[2] == '-n': #get Track Number
-                if include_empties:
-                    if self.imported_tracknumbers:
-                        try:
-                            trackn = int(line[len(line[:-7]):-3])
-                            if trackn <= enumber:
-                                mode = 10
-                        except:
-                            try:
-                                trackn = int(line[len(line[:-6]):-3])
-                                if trackn <= enumber:
-                                    mode = 10
-                            except:
-                                try:
-                                    trackn = int(line[len(line[:-5]):-3])
-                                    if trackn <= enumber:
-                                        mode = 10
-                                except:
-                                    try:
-                                        trackn = int(line[len(line[:-4]):-3])
-                                        if trackn <= enumber:
-                                            mode = 10
-                                    except:
-                                        print("Unable to load 1 marker.")
+            channels = (
+                ('.tx', camname+'_translateX', 'location', txaxis, invert_x, 0),
+                ('.ty', camname+'_translateY', 'location', tyaxis, invert_y, 0),
+                ('.tz', camname+'_translateZ', 'location', tzaxis, invert_z, 0),
+                ('.rx', camname+'_rotateX', 'rotation_euler', rxaxis, invert_rx, self.xadd),
+                ('.ry', camname+'_rotateY', 'rotation_euler', ryaxis, invert_ry, self.yadd),
+                ('.rz', camname+'_rotateZ', 'rotation_euler', rzaxis, invert_rz, self.zadd),
+                )
+            for channel, (plug, curve_name, data_path, axis, factor, offset) in enumerate(channels): #get Position and Rotation
+                curve = mscene.source(camname+plug) or mscene.node(curve_name)
+                if curve is not None and len(curve.keys()):
+                    keys = curve.keys()
+                else:
+                    # not animated, use the transform's value
+                    static = camtransform.value(plug[1])
+                    if not isinstance(static, list) or len(static) != 3:
+                        continue
+                    keys = np.array([[0.0, float(static['xyz'.index(plug[2])])]])
+                    curve = None
+                if data_path == 'location':
+                    values = keys[:, 1]*factor
+                else:
+                    values = np.radians(keys[:, 1]+offset)*factor
+                if curve is None:
+                    sync_value(newCamera, data_path, axis, values[0])
+                    continue
+                if data_path == 'location':
+                    tolerance = self.location_tolerance
+                else:
+                    tolerance = radians(self.rotation_tolerance)
+                write_curve(newCamera, data_path, axis, keys[:, 0] + frame_offset, values, tolerance,
+                            group='Object Transforms')
+                yield 0.2 + 0.3*(shot + (channel + 1.0)/len(channels))/len(shots)
+        
+        if activeCamera is not None:
+            scene.camera = activeCamera
+        
+        if include_empties: #get Trackers
+            timer.start('tracks')
+            tracks, skipped = TrackTable.from_scene(mscene, self.imported_tracknumbers)
+            if skipped:
+                print("Unable to load %d markers." % skipped)
+            if self.imported_tracknumbers and self.thin_tracks != 'SAMPLE':
+                # the tracks numbered up to enumber in the file
+                tracks = tracks.take(tracks.in_range(None, enumber))
+            locations = np.zeros((len(tracks), 3))
+            locations[:, (txaxis, tyaxis, tzaxis)] = tracks.positions*(invert_x, invert_y, invert_z)
+            tracks = tracks.moved(locations)
+            # bounds and thinning see the whole solve, the count is capped last
+            if self.use_bounds:
+                tracks = tracks.take(tracks.in_bounds(self.bounds_min, self.bounds_max))
+            if self.thin_tracks == 'MERGE':
+                count = len(tracks)
+                tracks = tracks.take(tracks.merged(self.merge_distance))
+                timer.count('tracks merged', count - len(tracks))
+            if self.thin_tracks == 'SAMPLE':
+                tracks = tracks.take(tracks.sample(enumber))
+            elif not self.imported_tracknumbers:
+                tracks = tracks.take(tracks.first(enumber))
+            ids = tracks.ids.tolist()
+            names = tracks.object_names(self.ename)
+            locations = tracks.positions
+            animated = tracks.curves
+            yield 0.5
+            timer.start('objects')
+            group = find_track_group(self.egroup) if self.sync else None
+            if group is None:
+                group = new_track_group(scene, self.egroup)
+            # empties of an earlier import, matched by their track number
+            existing = numbered_objects(self.ename) if self.sync else {}
+            if self.track_mode == 'POINTS':
+                # animated tracks can't live in the point cloud, they stay empties
+                static = tracks.take(~tracks.animated)
+                cloud = bpy.data.objects.get(self.egroup) if self.sync else None
+                if cloud is None or 'mayaascii_ename' not in cloud:
+                    cloud = add_point_cloud(scene, group, self.egroup, static.ids,
+                                            static.object_names(self.ename), static.positions)
+                    channel_changed(cloud, 'points', static.ids, static.positions)
+                    timer.count('objects')
+                elif channel_changed(cloud, 'points', static.ids, static.positions):
+                    mesh = cloud.data
+                    cloud.data = point_cloud_mesh(self.egroup, static.ids,
+                                                  static.object_names(self.ename), static.positions)
+                    bpy.data.meshes.remove(mesh)
+                    timer.count('updated')
+                else:
+                    timer.count('unchanged')
+                cloud['mayaascii_ename'] = self.ename
+                moving = np.flatnonzero(tracks.animated).tolist()
+                yield 0.5
+            else:
+                moving = range(len(names))
+            objects = [existing.get(ids[i]) for i in moving]
+            missing = [n for n, obj in enumerate(objects) if obj is None]
+            for start in range(0, len(missing), TRACK_BATCH):
+                batch = missing[start:start + TRACK_BATCH]
+                created = add_empties(scene, group, [(names[moving[n]], locations[moving[n]].tolist()) for n in batch])
+                for n, obj in zip(batch, created):
+                    objects[n] = obj
+                yield 0.5 + 0.3*start/len(missing)
+            timer.count('objects', len(missing))
+            fresh = set(missing)
+            timer.start('keyframes')
+            taxes = (txaxis, tyaxis, tzaxis)
+            tfactors = (invert_x, invert_y, invert_z)
+            for n, (obj, i) in enumerate(zip(objects, moving)):
+                if n and n % TRACK_BATCH == 0:
+                    yield 0.8 + 0.2*n/len(objects)
+                if animated[i] is None:
+                    # curves of an earlier import, when the track still moved
+                    removed = [remove_synced_fcurve(obj, 'location', axis) for axis in range(3)]
+                    if channel_changed(obj, 'location', locations[i]) or any(removed):
+                        obj.location = locations[i].tolist()
+                        if n not in fresh:
+                            timer.count('updated')
                     else:
-                        if trackn <= enumber:
-                            mode = 10
+                        timer.count('unchanged')
+                    continue
+                for axis, keys in enumerate(animated[i]):
+                    if keys is not None and len(keys):
+                        write_curve(obj, 'location', taxes[axis], keys[:, 0] + frame_offset,
+                                    keys[:, 1]*tfactors[axis], self.location_tolerance,
+                                    group='Object Transforms')
+                    elif remove_synced_fcurve(obj, 'location', taxes[axis]):
+                        obj.location[taxes[axis]] = locations[i][taxes[axis]]
             
-            elif mode == 10 and words[0] == 'setAttr' and words[1] == '".t"' and words[2] == '-type': #get Trackers
-                try:
-                    if self.flip_taxis:
-                        bpy.ops.object.empty_add(type='PLAIN_AXES', location=(float(words[4])*invert_x, float((words[6])[:-2])*invert_z, float(words[5])*invert_y))
-                    else:
-                        bpy.ops.object.empty_add(type='PLAIN_AXES', location=(float(words[4])*invert_x, float(words[5])*invert_y, float((words[5])[:-2])*invert_z))
-                    
-                    trackobj = bpy.context.active_object
-                    trackobj.name = self.ename + '.' + str(trackn).zfill(4)
-                    bpy.ops.object.group_link(group=self.egroup)
-                    bpy.ops.object.select_all(action = 'DESELECT')
-                    if not self.imported_tracknumbers:
-                        trackn = trackn + 1
-                    
-                except:
-                    print("Unable to load 1 marker.")
-                    
-                mode = 0
-                
-            elif words[0] == 'playbackOptions' and words[1] == '-min' and words[3] == '-max':
-                if not framesSet:
-                    scene.frame_start = int(words[2])
-                    scene.frame_end = int((words[4])[:-1])
-            else:
-                pass
+            if self.sync and self.remove_missing: #remove vanished Trackers
+                kept = set(ids)
+                for number, obj in existing.items():
+                    if number not in kept:
+                        remove_object(scene, obj)
+                        timer.count('removed')
+        
+        if not framesSet and mscene.playback_range is not None:
+            start, end = mscene.playback_range
+            if frame_range is not None:
+                start, end = max(start, frame_range[0]), min(end, frame_range[1])
+            if start <= end:
+                scene.frame_start = int(start + frame_offset)
+                scene.frame_end = int(end + frame_offset)
+        elif not framesSet and frame_range is not None:
+            scene.frame_start = frame_range[0] + frame_offset
+            scene.frame_end = frame_range[1] + frame_offset
             
+        timer.start('finish')
         scene.frame_set(oframe)
-        self.report({'INFO'}, 'Successfully imported.')
+        timer.stop()
+        print(timer.table())
+        self.report({'INFO'}, 'Successfully imported in %s' % timer.summary())
+
+
+class ImportMayaASCIIModal(ImportMayaASCII):
+    """Import a Maya ASCII file in small steps, keeping Blender responsive (ESC cancels)"""
+    bl_idname = "import.mayaascii_modal"
+    bl_label = "Import Maya ASCII (*.ma), Progressive"
+    bl_options = {'UNDO'}
+    
+    # seconds of import work per timer event
+    slice_time = 0.05
+    
+    def execute(self, context):
+        error = self.frameRangeError()
+        if error is not None:
+            self.report({'ERROR'}, error)
+            return {'CANCELLED'}
+        # phases are only timed (and profiled) while a time slice runs
+        self._phases = PhaseTimer()
+        self._profile = cProfile.Profile() if self.profile else None
+        self._steps = self.importSteps(self.filepath, self._phases)
+        self._snapshot = data_snapshot(context.scene)
+        wm = context.window_manager
+        wm.progress_begin(0, 100)
+        self._timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+    
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.finish(context)
+            self._steps.close()
+            rollback(context.scene, self._snapshot)
+            self.report({'WARNING'}, 'Import cancelled.')
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+        end = time.time() + self.slice_time
+        self._phases.resume()
+        if self._profile is not None:
+            self._profile.enable()
+        try:
+            while True:
+                progress = next(self._steps)
+                if time.time() >= end:
+                    break
+        except StopIteration:
+            self.finish(context)
+            return {'FINISHED'}
+        except Exception as error:
+            traceback.print_exc()
+            self.finish(context)
+            rollback(context.scene, self._snapshot)
+            self.report({'ERROR'}, 'Import failed: %s' % error)
+            return {'CANCELLED'}
+        finally:
+            if self._profile is not None:
+                self._profile.disable()
+            self._phases.pause()
+        context.window_manager.progress_update(int(progress*100))
+        return {'RUNNING_MODAL'}
+    
+    def finish(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        if self._profile is not None:
+            self._profile.disable()
+            write_profile(self._profile, os.path.splitext(self.filepath)[0] + '_import.prof')
+
+class InstanceTrackEmpties(bpy.types.Operator):
+    """Create empties for the selected points of an imported track point cloud"""
+    bl_idname = "object.mayaascii_instance_tracks"
+    bl_label = "Instance Track Empties"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj is not None and obj.type == 'MESH' and 'mayaascii_ename' in obj
+    
+    def execute(self, context):
+        obj = context.active_object
+        editmode = obj.mode == 'EDIT'
+        if editmode:
+            bpy.ops.object.mode_set(mode='OBJECT')
+        tracks = point_cloud_tracks(obj)
+        groups = getattr(obj, 'users_group', None) or getattr(obj, 'users_collection', ())
+        group = groups[0] if groups else new_track_group(context.scene, obj.name)
+        add_empties(context.scene, group, tracks)
+        if editmode:
+            bpy.ops.object.mode_set(mode='EDIT')
+        self.report({'INFO'}, 'Created %d empties.' % len(tracks))
+        return {'FINISHED'}
 
-            
 def menu_func(self, context):
     self.layout.operator(ImportMayaASCII.bl_idname, text="Maya ASCII (*.ma)")
+    self.layout.operator(ImportMayaASCIIModal.bl_idname, text="Maya ASCII (*.ma), Progressive")
 
 
 def register():
     bpy.utils.register_class(ImportMayaASCII)
+    bpy.utils.register_class(ImportMayaASCIIModal)
+    bpy.utils.register_class(InstanceTrackEmpties)
     bpy.types.INFO_MT_file_import.append(menu_func)
 
 def unregister():
     bpy.utils.unregister_class(ImportMayaASCII)
+    bpy.utils.unregister_class(ImportMayaASCIIModal)
+    bpy.utils.unregister_class(InstanceTrackEmpties)
     bpy.types.INFO_MT_file_import.remove(menu_func)
 
 if __name__ == "__main__":
@@ -0,0 +1,246 @@
+"""Batch conversion of Maya ASCII (.ma) solves.
+
+Inside Blender every solve is imported with the importer's operator and
+saved as one .blend per shot:
+
+    blender -b --python mayaascii_batch.py -- shots/ -o converted -j 4
+
+With plain Python the files are only parsed, and the camera and tracks of
+each shot are written to a compact .npz:
+
+    python mayaascii_batch.py "shots/*.ma" -o converted -j 4
+
+With -j above 1 the files are spread over that many worker processes
+(Blender instances for .blend output). A per-file timing and error summary
+is printed and written to batch_summary.json in the output folder.
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mayaascii_parser import parse_file
+from mayaascii_tracks import TrackTable
+from mayaascii_writer import process_pool
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+CAMERA_CHANNELS = ('tx', 'ty', 'tz', 'rx', 'ry', 'rz')
+
+
+def find_files(paths):
+    """Return the .ma files of the given directories, globs and files in order."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            matches = sorted(glob.glob(os.path.join(path, '*.ma')))
+        else:
+            matches = sorted(glob.glob(path))
+        for filename in matches:
+            if filename not in files:
+                files.append(filename)
+    return files
+
+
+def shot_name(filename):
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def _channel(scene, node, attr, frames, default):
+    curve = scene.source(node.name + '.' + attr)
+    if curve is not None and len(curve.keys()):
+        keys = curve.keys()
+        return np.interp(frames, keys[:, 0], keys[:, 1])
+    return np.full(len(frames), default, dtype=np.float64)
+
+
+def solve_arrays(scene):
+    """Return the camera and track arrays of a parsed solve for np.savez.
+
+    Values stay in Maya's axes; translations are converted to meters and
+    rotations are in degrees.
+    """
+    scale = scene.unit_scale
+    arrays = {'fps': np.array(np.nan if scene.fps is None else scene.fps)}
+    cameras = scene.cameras()
+    transform = scene.node(cameras[0].parent) if cameras else None
+    if transform is not None:
+        curve = scene.source(transform.name + '.tx')
+        if curve is not None and len(curve.keys()):
+            frames = curve.keys()[:, 0]
+        elif scene.playback_range is not None:
+            frames = np.arange(scene.playback_range[0], scene.playback_range[1] + 1, dtype=np.float64)
+        else:
+            frames = np.zeros(1)
+        camera = np.empty((len(frames), 6))
+        for i, attr in enumerate(CAMERA_CHANNELS):
+            static = transform.value(attr[0], [0.0, 0.0, 0.0])
+            camera[:, i] = _channel(scene, transform, attr, frames, float(static['xyz'.index(attr[1])]))
+        camera[:, :3] *= scale
+        lens = cameras[0].value('fl', 35.0)
+        arrays['camera_name'] = np.array(transform.name)
+        arrays['frames'] = frames
+        arrays['camera'] = camera
+        arrays['focal_length'] = _channel(scene, cameras[0], 'fl', frames, float(lens))
+    # animated tracks are stored at their first key
+    tracks = TrackTable.from_scene(scene)[0]
+    if transform is None and not len(tracks):
+        raise ValueError('no camera or tracks found')
+    arrays['track_names'] = tracks.names
+    arrays['track_positions'] = tracks.positions * scale
+    arrays['track_animated'] = tracks.animated
+    return arrays
+
+
+def convert_npz(task):
+    """Parse one solve and write <shot>.npz; returns its summary entry."""
+    filename, output = task
+    start = time.time()
+    result = {'file': filename, 'output': None, 'error': None}
+    try:
+        scene = parse_file(filename)
+        arrays = solve_arrays(scene)
+        path = os.path.join(output, shot_name(filename) + '.npz')
+        np.savez_compressed(path, **arrays)
+        result['output'] = path
+        result['tracks'] = len(arrays['track_names'])
+        result['frames'] = len(arrays.get('frames', ()))
+    except Exception:
+        result['error'] = traceback.format_exc()
+    result['seconds'] = time.time() - start
+    return result
+
+
+def import_operator():
+    """Return the importer's operator, registering the add-on if needed."""
+    import io_import_scene_MayaASCII
+    op = getattr(bpy.ops, 'import').mayaascii
+    try:
+        op.get_rna()
+    except KeyError:
+        io_import_scene_MayaASCII.register()
+    return op
+
+
+def convert_blend(task):
+    """Import one solve into an empty scene and save <shot>.blend."""
+    filename, output, options = task
+    start = time.time()
+    result = {'file': filename, 'output': None, 'error': None}
+    try:
+        bpy.ops.wm.read_factory_settings()
+        settings = {'clear_scene': True, 'use_cache': False}
+        settings.update(options)
+        import_operator()(filepath=os.path.abspath(filename), **settings)
+        path = os.path.abspath(os.path.join(output, shot_name(filename) + '.blend'))
+        bpy.ops.wm.save_as_mainfile(filepath=path)
+        result['output'] = path
+    except Exception:
+        result['error'] = traceback.format_exc()
+    result['seconds'] = time.time() - start
+    return result
+
+
+def run_blender(task):
+    """Convert one solve in a separate background Blender."""
+    filename, output, options = task
+    start = time.time()
+    command = [bpy.app.binary_path, '-b', '--factory-startup', '--python', os.path.abspath(__file__),
+               '--', filename, '-o', output, '-j', '1', '--summary', '']
+    for key, value in options.items():
+        command += ['--set', '%s=%r' % (key, value)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    log = process.communicate()[0].decode('utf-8', 'replace')
+    path = os.path.abspath(os.path.join(output, shot_name(filename) + '.blend'))
+    result = {'file': filename, 'output': None, 'error': None, 'seconds': time.time() - start}
+    if process.returncode == 0 and 'Traceback' not in log and os.path.isfile(path):
+        result['output'] = path
+    else:
+        result['error'] = log[-4000:] or 'Blender exited with code %d' % process.returncode
+    return result
+
+
+def parse_options(pairs):
+    options = {}
+    for pair in pairs:
+        key, value = pair.split('=', 1)
+        try:
+            options[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            options[key] = value
+    return options
+
+
+def write_summary(results, path, elapsed):
+    failed = [r for r in results if r['error']]
+    for r in results:
+        print('%-8s %7.2fs  %s' % ('FAILED' if r['error'] else 'ok', r['seconds'], r['file']))
+    for r in failed:
+        print('\n%s:\n%s' % (r['file'], r['error'].rstrip()))
+    print('%d files, %d failed, %.2fs' % (len(results), len(failed), elapsed))
+    if path:
+        with open(path, 'w') as file:
+            json.dump({'files': len(results), 'failed': len(failed), 'seconds': elapsed,
+                       'results': results}, file, indent=1)
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(prog='mayaascii_batch.py', description=__doc__.split('\n')[0])
+    parser.add_argument('paths', nargs='+', help='.ma files, directories or glob patterns')
+    parser.add_argument('-o', '--output', default='.', help='output folder')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='number of worker processes')
+    parser.add_argument('-f', '--format', choices=('blend', 'npz'),
+                        default='blend' if bpy is not None else 'npz')
+    parser.add_argument('--set', action='append', default=[], metavar='OPTION=VALUE',
+                        help='importer option for .blend output, e.g. track_mode=POINTS')
+    parser.add_argument('--summary', default=None,
+                        help='summary JSON path (default: batch_summary.json in the output folder)')
+    args = parser.parse_args(argv)
+    if args.format == 'blend' and bpy is None:
+        parser.error('.blend output needs Blender: blender -b --python mayaascii_batch.py -- ...')
+    files = find_files(args.paths)
+    if not files:
+        parser.error('no .ma files found')
+    if not os.path.isdir(args.output):
+        os.makedirs(args.output)
+    summary = args.summary
+    if summary is None:
+        summary = os.path.join(args.output, 'batch_summary.json')
+
+    start = time.time()
+    if args.format == 'npz':
+        tasks = [(f, args.output) for f in files]
+        if args.jobs > 1 and len(files) > 1:
+            with process_pool(args.jobs) as pool:
+                results = list(pool.map(convert_npz, tasks))
+        else:
+            results = [convert_npz(t) for t in tasks]
+    else:
+        options = parse_options(args.set)
+        tasks = [(f, args.output, options) for f in files]
+        if args.jobs > 1 and len(files) > 1:
+            with ThreadPoolExecutor(args.jobs) as pool:
+                results = list(pool.map(run_blender, tasks))
+        else:
+            results = [convert_blend(t) for t in tasks]
+    write_summary(results, summary, time.time() - start)
+    return 1 if any(r['error'] for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
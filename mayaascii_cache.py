@@ -0,0 +1,240 @@
+"""On-disk cache of parsed Maya ASCII scenes.
+
+Entries are keyed by the content hash of the .ma file plus the part of the
+file that was parsed. A small stat table maps (path, size, mtime) to that
+hash, so an unchanged file is found without reading it again. Animation
+curves and track positions are stored as packed NumPy arrays, everything
+else as JSON. The directory is kept below max_bytes by dropping the least
+recently used entries.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from mayaascii_parser import MayaAttr, MayaNode, MayaScene
+
+FORMAT = 4
+
+
+def default_directory():
+    return os.environ.get('MAYAASCII_CACHE_DIR',
+                          os.path.join(tempfile.gettempdir(), 'mayaascii_cache'))
+
+
+def file_hash(filename, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(filename, 'rb') as file:
+        chunk = file.read(chunk_size)
+        while chunk:
+            digest.update(chunk)
+            chunk = file.read(chunk_size)
+    return digest.hexdigest()
+
+
+def pack_scene(scene):
+    """Split a MayaScene into a dict of arrays for np.savez."""
+    nodes = []
+    key_nodes = []
+    keys = []
+    position_nodes = []
+    positions = []
+    for i, node in enumerate(scene.nodes):
+        attrs = {}
+        for name, attr in node.attrs.items():
+            if name == 'ktv':
+                key_nodes.append((i, len(attr.values), attr.index[0] if attr.index else -1,
+                                  attr.index[1] if attr.index else -1, attr.size or -1))
+                keys.append(attr.values)
+                continue
+            if attr.type == 'double3' and len(attr.values) == 3 and name == 't':
+                try:
+                    positions.append([float(v) for v in attr.values])
+                    position_nodes.append(i)
+                    continue
+                except ValueError:
+                    pass
+            attrs[name] = [attr.index, attr.type, attr.size, attr.values]
+        nodes.append([node.type, node.name, node.parent, node.shared, attrs])
+    meta = {
+        'format': FORMAT,
+        'linear_unit': scene.linear_unit,
+        'angular_unit': scene.angular_unit,
+        'time_unit': scene.time_unit,
+        'playback_range': scene.playback_range,
+        'connections': scene.connections,
+        'nodes': nodes,
+        }
+    return {
+        'meta': np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8),
+        'key_nodes': np.array(key_nodes, dtype=np.int64).reshape(-1, 5),
+        'keys': np.concatenate(keys) if keys else np.empty((0, 2)),
+        'position_nodes': np.array(position_nodes, dtype=np.int64),
+        'positions': np.array(positions, dtype=np.float64).reshape(-1, 3),
+        }
+
+
+def unpack_scene(arrays):
+    """Rebuild the MayaScene stored by pack_scene."""
+    meta = json.loads(arrays['meta'].tobytes().decode('utf-8'))
+    if meta.get('format') != FORMAT:
+        raise ValueError('unsupported cache format')
+    scene = MayaScene()
+    scene.linear_unit = meta['linear_unit']
+    scene.angular_unit = meta['angular_unit']
+    scene.time_unit = meta['time_unit']
+    if meta['playback_range'] is not None:
+        scene.playback_range = tuple(meta['playback_range'])
+    scene.connections = [tuple(c) for c in meta['connections']]
+    for type, name, parent, shared, attrs in meta['nodes']:
+        node = scene.add_node(MayaNode(type, name, parent, shared))
+        for attr_name, (index, attr_type, size, values) in attrs.items():
+            node.attrs[attr_name] = MayaAttr(attr_name, tuple(index) if index else None,
+                                             attr_type, size, values)
+    keys = arrays['keys']
+    start = 0
+    for i, count, first, last, size in arrays['key_nodes'].tolist():
+        index = (first, last) if first >= 0 else None
+        scene.nodes[i].attrs['ktv'] = MayaAttr('ktv', index, None, size if size >= 0 else None,
+                                               keys[start:start + count])
+        start += count
+    for i, position in zip(arrays['position_nodes'].tolist(), arrays['positions'].tolist()):
+        scene.nodes[i].attrs['t'] = MayaAttr('t', None, 'double3', None, position)
+    return scene
+
+
+class SceneCache(object):
+    """Size-bounded LRU cache of parsed scenes in a directory."""
+
+    def __init__(self, directory=None, max_bytes=256 << 20):
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _stats_path(self):
+        return os.path.join(self.directory, 'stats.json')
+
+    def _read_stats(self):
+        try:
+            with open(self._stats_path(), 'r') as file:
+                return json.load(file)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _write_stats(self, stats):
+        if len(stats) > 1000:
+            for key in sorted(stats, key=lambda k: stats[k][1])[:len(stats) - 1000]:
+                del stats[key]
+        self._write(self._stats_path(), lambda file: file.write(json.dumps(stats).encode('utf-8')))
+
+    def _write(self, path, write):
+        # write to a temporary file first so concurrent readers never see half an entry
+        handle, temp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as file:
+                write(file)
+            os.replace(temp, path)
+        except Exception:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+
+    def content_key(self, filename):
+        """Return the content hash of filename, hashing it only if it changed."""
+        stat = os.stat(filename)
+        stat_key = '%s|%d|%r' % (os.path.abspath(filename), stat.st_size, stat.st_mtime)
+        stats = self._read_stats()
+        entry = stats.get(stat_key)
+        if entry is not None:
+            return entry[0]
+        digest = file_hash(filename)
+        try:
+            # created on the first miss, so put() finds the hash recorded
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            stats[stat_key] = [digest, stat.st_mtime]
+            self._write_stats(stats)
+        except (IOError, OSError):
+            # not writable, the file is hashed again next time
+            pass
+        return digest
+
+    def _entry_path(self, digest, selection):
+        selection = hashlib.sha1(repr(selection).encode('utf-8')).hexdigest()[:12]
+        return os.path.join(self.directory, '%s-%s.npz' % (digest, selection))
+
+    def get(self, filename, selection=''):
+        """Return the cached MayaScene for filename, or None."""
+        path = self._entry_path(self.content_key(filename), selection)
+        try:
+            with np.load(path) as arrays:
+                scene = unpack_scene(arrays)
+        except Exception:
+            # missing, or truncated / corrupt (BadZipFile, EOFError, ...):
+            # drop the entry so the scene is parsed and stored again
+            self.misses += 1
+            if os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            return None
+        # the entry's mtime is its last use for the LRU policy
+        os.utime(path, None)
+        self.hits += 1
+        return scene
+
+    def put(self, filename, scene, selection=''):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        path = self._entry_path(self.content_key(filename), selection)
+        arrays = pack_scene(scene)
+        self._write(path, lambda file: np.savez(file, **arrays))
+        self.evict()
+
+    def load(self, filename, parse, selection=''):
+        """Return the cached scene for filename, or parse() it and store it."""
+        scene = self.get(filename, selection)
+        if scene is None:
+            scene = parse()
+            try:
+                self.put(filename, scene, selection)
+            except (IOError, OSError) as error:
+                print("Unable to write scene cache: %s" % error)
+        return scene
+
+    def entries(self):
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.npz'):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_bytes."""
+        entries = sorted(self.entries())
+        total = sum(e[1] for e in entries)
+        for mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        for mtime, size, path in self.entries():
+            os.remove(path)
+        if os.path.exists(self._stats_path()):
+            os.remove(self._stats_path())
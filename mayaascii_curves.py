@@ -0,0 +1,53 @@
+"""Keyframe reduction for dense, per-frame animation curves.
+
+Solves are keyed on every frame of every channel, even where a channel is
+constant or moves along a straight line. simplify_keys picks the keys that
+are needed to stay within a tolerance of the original curve when the kept
+keys are interpolated linearly; the importer and exporter use it on their
+key arrays before writing them.
+"""
+import numpy as np
+
+
+def simplify_keys(frames, values, tolerance):
+    """Return the indices of the keys to keep, in order.
+
+    A channel that varies by no more than tolerance collapses to its first
+    key. Otherwise the first and last key are kept and every run between
+    two kept keys is split at its worst key while that key is further than
+    tolerance from the line between them (Ramer-Douglas-Peucker on the
+    values). All runs are split at once per pass, so a pass is a handful of
+    array operations over the whole curve.
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    count = len(values)
+    if count <= 2:
+        return np.arange(count)
+    if values.max() - values.min() <= tolerance:
+        return np.zeros(1, dtype=np.intp)
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    points = np.arange(count)
+    while True:
+        kept = np.flatnonzero(keep)
+        # the run each key lies in, between kept[run] and kept[run + 1]
+        run = np.minimum(np.searchsorted(kept, points, side='right') - 1, len(kept) - 2)
+        start = kept[run]
+        end = kept[run + 1]
+        t = (frames - frames[start]) / (frames[end] - frames[start])
+        error = np.abs(values - (values[start] + t*(values[end] - values[start])))
+        error[keep] = 0.0
+        worst = np.maximum.reduceat(error, kept[:-1])
+        split = np.flatnonzero((error > tolerance) & (error == worst[run]))
+        if not len(split):
+            return kept
+        # one split per run, at its first worst key
+        runs, first = np.unique(run[split], return_index=True)
+        keep[split[first]] = True
+
+
+def reduce_keys(frames, values, tolerance):
+    """Return the (frames, values) of the keys simplify_keys keeps."""
+    keep = simplify_keys(frames, values, tolerance)
+    return np.asarray(frames)[keep], np.asarray(values)[keep]
@@ -0,0 +1,831 @@
+"""Blender independent reader for Maya ASCII (.ma) files.
+
+Turns the MEL statements written by MatchMover (and Maya itself) into a small
+scene model, so solves can be parsed, inspected and profiled in plain Python.
+The importer add-on only builds Blender data from the resulting MayaScene.
+"""
+import mmap
+import os
+import re
+
+import numpy as np
+
+# linear units in meters
+LINEAR_UNITS = {
+    'millimeter': 0.001, 'mm': 0.001,
+    'centimeter': 0.01, 'cm': 0.01,
+    'meter': 1.0, 'm': 1.0,
+    'kilometer': 1000.0, 'km': 1000.0,
+    'inch': 0.0254, 'in': 0.0254,
+    'foot': 0.3048, 'ft': 0.3048,
+    'yard': 0.9144, 'yd': 0.9144,
+    'mile': 1609.344, 'mi': 1609.344,
+    }
+
+# time units in frames per second
+TIME_UNITS = {
+    'game': 15, 'film': 24, 'pal': 25, 'ntsc': 30,
+    'show': 48, 'palf': 50, 'ntscf': 60,
+    }
+
+ANIM_CURVE_TYPES = ('animCurveTL', 'animCurveTA', 'animCurveTU', 'animCurveTT')
+
+# long names of the attributes followed through connections, so plugs can be
+# looked up by either name
+SHORT_ATTRS = {
+    'translateX': 'tx', 'translateY': 'ty', 'translateZ': 'tz',
+    'rotateX': 'rx', 'rotateY': 'ry', 'rotateZ': 'rz',
+    'scaleX': 'sx', 'scaleY': 'sy', 'scaleZ': 'sz',
+    'visibility': 'v', 'focalLength': 'fl', 'frameExtension': 'fe',
+    'imagePlane': 'ip', 'message': 'msg', 'output': 'o', 'input': 'i',
+    }
+
+# nodes Maya may insert between a curve and the attribute it drives
+PASSTHROUGH_TYPES = ('unitConversion',)
+
+_ATTR_RE = re.compile(r'^\.?([^\[]+)(?:\[(-?\d+)(?::(-?\d+))?\])?$')
+_ESCAPE_RE = re.compile(r'\\(.)')
+
+# setAttr / createNode / connectAttr flags that don't take an argument
+_SWITCH_FLAGS = frozenset(('-av', '-alteredValue', '-c', '-clamp',
+                           '-s', '-shared', '-ss', '-skipSelect',
+                           '-na', '-nextAvailable', '-f', '-force'))
+
+
+def decode_ktv(payload):
+    """Decode the time/value pairs of a .ktv setAttr into an (N, 2) array.
+
+    payload is either the text after the attribute name or its tokens.
+    """
+    if isinstance(payload, (str, bytes)):
+        if isinstance(payload, bytes):
+            payload = payload.decode('ascii')
+        values = np.fromstring(payload, dtype=np.float64, sep=' ')
+    else:
+        values = np.asarray(payload, dtype=np.float64)
+    if len(values) % 2:
+        raise ValueError('odd number of values in ktv array')
+    return values.reshape(-1, 2)
+
+
+def decode_ktv_range(payload, first, last, index=None):
+    """Decode the keys of a .ktv payload between frames first and last.
+
+    Solves are keyed on every frame, so once the frame of the first key is
+    known the wanted keys are found by their position: the payload is only
+    split up to the last wanted key and the rest is never tokenized. The
+    key count of the index header ('.ktv[0:140]') bounds the split. If the
+    keys turn out not to be one per frame, the payload is decoded in full
+    and masked. Returns (keys, position of the first returned key).
+    """
+    if isinstance(payload, str):
+        payload = payload.encode('ascii')
+    head = payload.split(None, 2)
+    if len(head) < 2:
+        return decode_ktv(payload), 0
+    start = float(head[0])
+    if start > last:
+        return np.empty((0, 2)), 0
+    skip = max(0, int(np.ceil(first - start)))
+    stop = int(np.floor(last - start)) + 1
+    if index is not None:
+        stop = min(stop, index[1] - index[0] + 1)
+    if start == int(start) and first == int(first) and last == int(last) and stop > skip:
+        tokens = payload.split(None, 2*stop)
+        keys = decode_ktv(tokens[2*skip:2*stop])
+        # all wanted keys, or the ones up to the end of the payload
+        complete = len(keys) == stop - skip or (len(keys) and len(tokens) <= 2*stop)
+        if complete and np.array_equal(keys[:, 0], start + np.arange(skip, skip + len(keys))):
+            return keys, skip
+    keys = decode_ktv(payload)
+    mask = (keys[:, 0] >= first) & (keys[:, 0] <= last)
+    return keys[mask], int(np.argmax(mask)) if mask.any() else 0
+
+
+def unquote(token):
+    if len(token) >= 2 and token[0] == '"' and token[-1] == '"':
+        token = token[1:-1]
+        return _ESCAPE_RE.sub(r'\1', token) if '\\' in token else token
+    return token
+
+
+def node_name(name):
+    """Reduce a DAG path ('|group|node') or root namespace name (':time1') to the node name."""
+    if '|' in name:
+        name = name.rsplit('|', 1)[-1]
+    return name.lstrip(':')
+
+
+def split_plug(plug):
+    """Return the (node name, short attribute) of a 'node.attr' plug.
+
+    Node names are reduced with node_name and array indices are dropped.
+    """
+    node, _, attr = plug.partition('.')
+    node = node_name(node)
+    attr = attr.split('[', 1)[0]
+    return node, SHORT_ATTRS.get(attr, attr)
+
+
+def split_attr(spec):
+    """Split an attribute spec like '.ktv[0:140]' into ('ktv', (0, 140))."""
+    match = _ATTR_RE.match(spec)
+    if match is None:
+        return spec.lstrip('.'), None
+    name, first, last = match.groups()
+    if first is None:
+        return name, None
+    first = int(first)
+    return name, (first, int(last) if last is not None else first)
+
+
+class MayaAttr(object):
+    """One setAttr statement: raw value tokens plus its -type and -s size."""
+    __slots__ = ('name', 'index', 'type', 'size', 'values')
+
+    def __init__(self, name, index=None, type=None, size=None, values=None):
+        self.name = name
+        self.index = index
+        self.type = type
+        self.size = size
+        self.values = values if values is not None else []
+
+    def floats(self):
+        return [float(v) for v in self.values]
+
+    def string(self):
+        return unquote(self.values[0]) if self.values else ''
+
+    def __repr__(self):
+        return 'MayaAttr(%r, type=%r, %d values)' % (self.name, self.type, len(self.values))
+
+
+class MayaNode(object):
+    """A node created by createNode (or selected with select -ne).
+
+    shared is set for nodes created with createNode -s, such as the
+    persp, top, front and side cameras Maya writes into every file.
+    """
+    __slots__ = ('type', 'name', 'parent', 'shared', 'attrs')
+
+    def __init__(self, type, name, parent=None, shared=False):
+        self.type = type
+        self.name = name
+        self.parent = parent
+        self.shared = shared
+        self.attrs = {}
+
+    def attr(self, name):
+        return self.attrs.get(name)
+
+    def value(self, name, default=None):
+        attr = self.attrs.get(name)
+        if attr is None or len(attr.values) == 0:
+            return default
+        if attr.type == 'string':
+            return attr.string()
+        values = attr.floats()
+        return values[0] if len(values) == 1 else values
+
+    def keys(self):
+        """Return the keys of an animCurve node as an (N, 2) frame/value array."""
+        attr = self.attrs.get('ktv')
+        if attr is None:
+            return np.empty((0, 2))
+        return attr.values
+
+    def __repr__(self):
+        return 'MayaNode(%r, %r, parent=%r)' % (self.type, self.name, self.parent)
+
+
+class MayaScene(object):
+    """Nodes, connections and scene settings of one Maya ASCII file."""
+
+    def __init__(self):
+        self.linear_unit = None
+        self.angular_unit = None
+        self.time_unit = None
+        self.playback_range = None
+        self.nodes = []
+        self.node_map = {}
+        self.connections = []
+        self._graph = None
+        # lines and statements read to build the scene (0 if it came from a cache)
+        self.lines = 0
+        self.statements = 0
+
+    def node(self, name):
+        if name is not None:
+            name = node_name(name)
+        return self.node_map.get(name)
+
+    def graph(self):
+        """Return the (inputs, outputs, children) indices of the scene.
+
+        inputs maps (node, attr) to the source nodes connected into that
+        plug, outputs maps a node name to the (node, attr) plugs it drives
+        and children maps a node name to the nodes parented to it. Attribute
+        names are the short names of SHORT_ATTRS. The indices are built once
+        and rebuilt when nodes or connections are added.
+        """
+        state = (len(self.nodes), len(self.connections))
+        if self._graph is None or self._graph[0] != state:
+            inputs = {}
+            outputs = {}
+            children = {}
+            for src, dst in self.connections:
+                src_node = split_plug(src)[0]
+                dst_plug = split_plug(dst)
+                inputs.setdefault(dst_plug, []).append(src_node)
+                outputs.setdefault(src_node, []).append(dst_plug)
+            for node in self.nodes:
+                if node.parent is not None:
+                    children.setdefault(node.parent, []).append(node)
+            self._graph = (state, inputs, outputs, children)
+        return self._graph[1:]
+
+    def sources(self, plug):
+        """Return the nodes connected into plug ('node.attr' with a short or long attr name).
+
+        Conversion nodes in between (PASSTHROUGH_TYPES) are followed to
+        the node feeding them.
+        """
+        inputs = self.graph()[0]
+        nodes = []
+        for name in inputs.get(split_plug(plug), ()):
+            node = self.node_map.get(name)
+            if node is not None and node.type in PASSTHROUGH_TYPES:
+                node = self.source(name + '.i')
+            if node is not None:
+                nodes.append(node)
+        return nodes
+
+    def source(self, plug):
+        """Return the (first) node connected into plug, or None."""
+        nodes = self.sources(plug)
+        return nodes[0] if nodes else None
+
+    def destinations(self, name):
+        """Return the (node, attr) plugs driven by the node called name."""
+        return self.graph()[1].get(name, [])
+
+    def children(self, name):
+        return self.graph()[2].get(name, [])
+
+    def nodes_of_type(self, type):
+        return [n for n in self.nodes if n.type == type]
+
+    def cameras(self):
+        """Return the camera shapes of the file, without Maya's shared startup cameras."""
+        return [n for n in self.nodes if n.type == 'camera' and not n.shared]
+
+    def add_node(self, node):
+        self.nodes.append(node)
+        self.node_map[node.name] = node
+        return node
+
+    @property
+    def unit_scale(self):
+        """Multiplier from the file's linear unit to meters (1 if unset)."""
+        if self.linear_unit is None:
+            return 1.0
+        return LINEAR_UNITS.get(self.linear_unit, 1.0)
+
+    @property
+    def fps(self):
+        if self.time_unit is None:
+            return None
+        if self.time_unit in TIME_UNITS:
+            return TIME_UNITS[self.time_unit]
+        if self.time_unit.endswith('fps'):
+            try:
+                return float(self.time_unit[:-3])
+            except ValueError:
+                pass
+        return None
+
+
+def _flags(args, start=0):
+    """Collect '-flag value' pairs from args, return (flags, positional)."""
+    flags = {}
+    positional = []
+    i = start
+    while i < len(args):
+        arg = args[i]
+        if arg.startswith('-') and not arg[1:2].isdigit() and arg[1:2] != '.':
+            if arg in _SWITCH_FLAGS or i + 1 >= len(args):
+                flags[arg] = True
+                i += 1
+            else:
+                flags[arg] = args[i + 1]
+                i += 2
+        else:
+            positional.append(arg)
+            i += 1
+    return flags, positional
+
+
+_SPACE_RE = re.compile(br'[ \t\r\n]*')
+_WORD_RE = re.compile(br'[ \t\r\n]*(?:("(?:[^"\\]|\\.)*")|([^\s";]+)|(;))', re.S)
+_WORDS_RE = re.compile(br'"(?:[^"\\]|\\.)*"|[^\s"]+', re.S)
+_DELIM_RE = re.compile(br'[;"]')
+_QUOTED_RE = re.compile(br'(?:[^"\\]|\\.)*', re.S)
+
+
+class StatementReader(object):
+    """Streams MEL statements out of a binary file object.
+
+    Iterating yields the command word of each statement. Its arguments can
+    then be pulled with word(), words() or payload(); whatever the caller
+    doesn't read is skipped without being tokenized as soon as the next
+    statement is requested. Statements may span any number of lines and
+    only one read chunk (plus the statement asked for) is held in memory.
+    """
+
+    def __init__(self, stream, chunk_size=1 << 16, offset=0):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.offset = offset
+        self.statements = 0
+        self.lines = 0
+        self._buf = b''
+        self._pos = 0
+        self._base = offset
+        self._eof = False
+        self._open = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._open:
+            self.skip()
+        while True:
+            pos = _SPACE_RE.match(self._buf, self._pos).end()
+            self._pos = pos
+            if len(self._buf) - pos < 2 and self._fill():
+                continue
+            if pos == len(self._buf):
+                raise StopIteration
+            if self._buf.startswith(b'//', pos):
+                # comment line
+                end = self._buf.find(b'\n', pos)
+                if end >= 0:
+                    self._pos = end + 1
+                elif not self._fill():
+                    self._pos = len(self._buf)
+            elif self._buf[pos:pos + 1] == b';':
+                self._pos = pos + 1
+            else:
+                break
+        self.offset = self._base + self._pos
+        self._open = True
+        self.statements += 1
+        return self.word()
+
+    next = __next__
+
+    def _fill(self):
+        if self._eof:
+            return False
+        data = self.stream.read(self.chunk_size)
+        if not data:
+            self._eof = True
+            return False
+        self.lines += data.count(b'\n')
+        self._base += self._pos
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def word(self):
+        """Return the next word of the current statement, None at its end."""
+        while self._open:
+            match = _WORD_RE.match(self._buf, self._pos)
+            if (match is None or match.end() == len(self._buf)) and self._fill():
+                continue
+            if match is None:
+                self._pos = len(self._buf)
+                self._open = False
+                return None
+            self._pos = match.end()
+            if match.group(3):
+                self._open = False
+                return None
+            return (match.group(1) or match.group(2)).decode('utf-8', 'replace')
+        return None
+
+    def words(self):
+        """Return the remaining words of the current statement."""
+        return [word.decode('utf-8', 'replace') for word in _WORDS_RE.findall(self.payload())]
+
+    def payload(self):
+        """Return the rest of the current statement as raw bytes."""
+        pieces = []
+        self._scan(pieces)
+        return b''.join(pieces)
+
+    def skip(self):
+        """Move past the rest of the current statement without reading it."""
+        self._scan(None)
+
+    def _scan(self, pieces):
+        quoted = False
+        while self._open:
+            buf = self._buf
+            pos = self._pos
+            more = False
+            if quoted:
+                # up to the closing quote, or the last complete escape
+                end = _QUOTED_RE.match(buf, pos).end()
+                if buf[end:end + 1] == b'"':
+                    end += 1
+                    quoted = False
+                else:
+                    more = True
+            else:
+                match = _DELIM_RE.search(buf, pos)
+                if match is None:
+                    end = len(buf)
+                    more = True
+                elif match.group() == b'"':
+                    end = match.end()
+                    quoted = True
+                else:
+                    end = match.start()
+                    self._open = False
+            if pieces is not None and end > pos:
+                pieces.append(buf[pos:end])
+            self._pos = end
+            if not self._open:
+                self._pos += 1
+            elif more and not self._fill():
+                self._open = False
+
+
+class MayaParser(object):
+    """Feeds the statements of a StatementReader into a MayaScene.
+
+    Statements are dispatched on their command word through `commands`,
+    and setAttr statements on the type of the current node through
+    `attr_handlers`, so the cost of a statement doesn't depend on how many
+    commands or node types are handled. Both tables can be extended. If
+    node_types is given, setAttr statements of nodes of other types are
+    skipped without being tokenized. If frame_range is a (first, last)
+    pair, only the keys of animation curves in that range are decoded.
+    """
+
+    def __init__(self, scene=None, node_types=None, frame_range=None):
+        self.scene = scene if scene is not None else MayaScene()
+        self.node_types = node_types
+        self.frame_range = frame_range
+        self.current = None
+        self.commands = {
+            'setAttr': self._set_attr,
+            'createNode': self._create_node,
+            'connectAttr': self._connect_attr,
+            'select': self._select,
+            'currentUnit': self._current_unit,
+            'playbackOptions': self._playback_options,
+            }
+        # node type -> setAttr handler(node, reader), filled in on first use
+        self.attr_handlers = {}
+
+    def feed(self, reader):
+        commands = self.commands
+        for command in reader:
+            handler = commands.get(command)
+            if handler is not None:
+                handler(reader)
+        self.scene.lines += reader.lines
+        self.scene.statements += reader.statements
+        return self.scene
+
+    def _create_node(self, reader):
+        words = reader.words()
+        if not words:
+            return
+        flags, positional = _flags(words, 1)
+        name = flags.get('-n', flags.get('-name'))
+        parent = flags.get('-p', flags.get('-parent'))
+        name = unquote(name) if isinstance(name, str) else words[0]
+        parent = node_name(unquote(parent)) if isinstance(parent, str) else None
+        shared = '-s' in flags or '-shared' in flags
+        self.current = self.scene.add_node(MayaNode(words[0], name, parent, shared))
+
+    def _connect_attr(self, reader):
+        flags, positional = _flags(reader.words())
+        if len(positional) >= 2:
+            self.scene.connections.append((unquote(positional[0]), unquote(positional[1])))
+
+    def _select(self, reader):
+        flags, positional = _flags(reader.words())
+        name = flags.get('-ne', flags.get('-noExpand'))
+        if isinstance(name, bool) or name is None:
+            name = positional[0] if positional else None
+        if name is not None:
+            name = node_name(unquote(name))
+            node = self.scene.node(name)
+            if node is None:
+                node = self.scene.add_node(MayaNode(None, name))
+            self.current = node
+
+    def _current_unit(self, reader):
+        flags, positional = _flags(reader.words())
+        self.scene.linear_unit = flags.get('-l', flags.get('-linear', self.scene.linear_unit))
+        self.scene.angular_unit = flags.get('-a', flags.get('-angle', self.scene.angular_unit))
+        self.scene.time_unit = flags.get('-t', flags.get('-time', self.scene.time_unit))
+
+    def _playback_options(self, reader):
+        flags, positional = _flags(reader.words())
+        try:
+            self.scene.playback_range = (float(flags.get('-min', flags.get('-minTime'))),
+                                         float(flags.get('-max', flags.get('-maxTime'))))
+        except (TypeError, ValueError):
+            pass
+
+    def _attr_handler(self, type):
+        if self.node_types is not None and type is not None and type not in self.node_types:
+            handler = None
+        else:
+            handler = self._read_attr
+        self.attr_handlers[type] = handler
+        return handler
+
+    def _set_attr(self, reader):
+        node = self.current
+        if node is None:
+            return
+        try:
+            handler = self.attr_handlers[node.type]
+        except KeyError:
+            handler = self._attr_handler(node.type)
+        if handler is not None:
+            handler(node, reader)
+
+    def _read_attr(self, node, reader):
+        size = None
+        word = reader.word()
+        while word is not None and not word.startswith('"'):
+            if word in ('-s', '-size'):
+                size = int(float(reader.word() or 0))
+            elif word not in _SWITCH_FLAGS:
+                reader.word()
+            word = reader.word()
+        if word is None:
+            return
+        name, index = split_attr(unquote(word))
+        if name == 'ktv':
+            if self.frame_range is None:
+                values = decode_ktv(reader.payload())
+            else:
+                values, skip = decode_ktv_range(reader.payload(), self.frame_range[0],
+                                                self.frame_range[1], index)
+                if index is not None:
+                    index = (index[0] + skip, index[0] + skip + len(values) - 1)
+                size = len(values)
+            attr = node.attrs.get(name)
+            if attr is not None:
+                # keys split over several statements
+                attr.values = np.concatenate((attr.values, values))
+                attr.size = (attr.size or 0) + (size or 0)
+            else:
+                node.attrs[name] = MayaAttr(name, index, None, size, values)
+            return
+        values = reader.words()
+        type = None
+        if len(values) >= 2 and values[0] == '-type':
+            type = unquote(values[1])
+            values = values[2:]
+        node.attrs[name] = MayaAttr(name, index, type, size, values)
+
+
+def parse(stream, scene=None, node_types=None, frame_range=None):
+    """Parse a binary file object into a MayaScene."""
+    return MayaParser(scene, node_types, frame_range).feed(StatementReader(stream))
+
+
+def parse_file(filename, node_types=None, frame_range=None):
+    with open(filename, 'rb') as file:
+        return parse(file, node_types=node_types, frame_range=frame_range)
+
+
+# statements that start a node block (createNode, select) or stand on their own
+_INDEX_RE = re.compile(br'^[ \t]*(createNode|select|connectAttr|disconnectAttr|parent|relationship|'
+                       br'currentUnit|playbackOptions|requires|fileInfo|lockNode)[ \t]+([^;\n]*)', re.M)
+_NAME_RE = re.compile(br'-n(?:ame)?[ \t]+"([^"]*)"')
+_PARENT_RE = re.compile(br'-p(?:arent)?[ \t]+"([^"]*)"')
+_SELECT_RE = re.compile(br'(?:^|[ \t])"?([^\s"-][^\s"]*)"?[ \t]*$')
+_SHARED_RE = re.compile(br'(?:^|[ \t])-s(?:hared)?(?=[ \t]|$)')
+
+
+class _Slice(object):
+    """Read-only file object for the byte range [start, end) of a file."""
+
+    def __init__(self, file, start, end):
+        file.seek(start)
+        self.file = file
+        self.left = end - start
+
+    def read(self, size=-1):
+        if size < 0 or size > self.left:
+            size = self.left
+        self.left -= size
+        return self.file.read(size) if size else b''
+
+
+# smallest file parsed in several processes, and smallest chunk handed to one
+PARALLEL_MIN_BYTES = 16 << 20
+PARALLEL_CHUNK_BYTES = 4 << 20
+
+
+def _parse_entries(filename, parser, entries, start, stop, types=None, names=None):
+    """Parse the byte range [start, stop) of filename, holding the index entries, into parser.
+
+    Node blocks that aren't wanted (see NodeIndex.parse) are added without
+    attributes and never read.
+    """
+    with open(filename, 'rb') as file:
+        for i, (offset, command, type, name, parent, shared) in enumerate(entries):
+            if (command != 'createNode' or types is None or type in types or
+                    (names is not None and name in names)):
+                continue
+            if start < offset:
+                parser.feed(StatementReader(_Slice(file, start, offset), offset=start))
+            parser.scene.add_node(MayaNode(type, name, parent, shared))
+            parser.current = None
+            start = entries[i + 1][0] if i + 1 < len(entries) else stop
+        if start < stop:
+            parser.feed(StatementReader(_Slice(file, start, stop), offset=start))
+    return parser.scene
+
+
+def _parse_chunk(task):
+    """Parse one chunk in a worker process; returns its scene as packed arrays."""
+    from mayaascii_cache import pack_scene
+    filename, entries, start, stop, types, names, frame_range = task
+    scene = _parse_entries(filename, MayaParser(frame_range=frame_range), entries, start, stop,
+                           types, names)
+    return pack_scene(scene), scene.lines, scene.statements
+
+
+def _merge_chunk(scene, result):
+    """Merge a _parse_chunk result into scene."""
+    # imported here, the cache module depends on this one
+    from mayaascii_cache import unpack_scene
+    arrays, lines, statements = result
+    _merge_scene(scene, unpack_scene(arrays))
+    scene.lines += lines
+    scene.statements += statements
+
+
+def _merge_scene(scene, part):
+    """Append the nodes, connections and settings of the next chunk's scene."""
+    for node in part.nodes:
+        # 'select -ne' of a node created in an earlier chunk
+        existing = scene.node_map.get(node.name) if node.type is None else None
+        if existing is not None:
+            existing.attrs.update(node.attrs)
+        else:
+            scene.add_node(node)
+    scene.connections.extend(part.connections)
+    for attr in ('linear_unit', 'angular_unit', 'time_unit', 'playback_range'):
+        if getattr(part, attr) is not None:
+            setattr(scene, attr, getattr(part, attr))
+
+
+class NodeIndex(object):
+    """Byte offsets of the node blocks and top-level statements of a file.
+
+    Built with a single regex scan over an mmap of the file. entries holds
+    (offset, command, type, name, parent, shared) tuples in file order; a node
+    block runs from its createNode (or select) to the next entry. The index
+    can be reused to parse only the nodes a caller needs and to summarize
+    a file without parsing it.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        stat = os.stat(filename)
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self.entries = []
+        if self.size == 0:
+            return
+        with open(filename, 'rb') as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                self._scan(data)
+            finally:
+                data.close()
+
+    def _scan(self, data):
+        append = self.entries.append
+        for match in _INDEX_RE.finditer(data):
+            command = match.group(1).decode('ascii')
+            args = match.group(2)
+            if command == 'createNode':
+                type = args.split(None, 1)[0].decode('utf-8', 'replace') if args.strip() else None
+                name = _NAME_RE.search(args)
+                parent = _PARENT_RE.search(args)
+                name = name.group(1).decode('utf-8', 'replace') if name else type
+                parent = node_name(parent.group(1).decode('utf-8', 'replace')) if parent else None
+                shared = _SHARED_RE.search(args) is not None
+                append((match.start(1), command, type, name, parent, shared))
+            elif command == 'select':
+                name = _SELECT_RE.search(args)
+                name = node_name(name.group(1).decode('utf-8', 'replace')) if name else None
+                append((match.start(1), command, None, name, None, False))
+            else:
+                append((match.start(1), command, None, None, None, False))
+
+    def nodes(self, type=None):
+        """Return the (offset, command, type, name, parent, shared) entries of created nodes."""
+        return [e for e in self.entries if e[1] == 'createNode' and (type is None or e[2] == type)]
+
+    def count(self, type):
+        return sum(1 for e in self.entries if e[1] == 'createNode' and e[2] == type)
+
+    def parse(self, types=None, names=None, scene=None, frame_range=None, workers=0):
+        """Parse the top-level statements plus the wanted node blocks.
+
+        A createNode block is wanted if its node type is in types or its
+        name is in names; types=None selects every node. Skipped nodes are
+        still added to the scene, without attributes, and their blocks are
+        never read. frame_range limits the decoded keys (see MayaParser).
+        With workers > 1 files of PARALLEL_MIN_BYTES and more are parsed
+        in chunks by a process pool (see parse_chunks).
+        """
+        workers = min(workers, os.cpu_count() or 1)
+        if workers > 1 and self.size >= PARALLEL_MIN_BYTES:
+            return self.parse_chunks(types, names, scene, frame_range, workers)
+        parser = MayaParser(scene, frame_range=frame_range)
+        return _parse_entries(self.filename, parser, self.entries, 0, self.size, types, names)
+
+    def chunks(self, chunk_bytes):
+        """Split the file at createNode entries into byte ranges of about chunk_bytes.
+
+        Returns (first entry, end entry, start offset, stop offset) tuples
+        in file order; the first range also holds the header.
+        """
+        entries = self.entries
+        bounds = [0]
+        split = chunk_bytes
+        for i, (offset, command, type, name, parent, shared) in enumerate(entries):
+            if command == 'createNode' and offset >= split and i > bounds[-1]:
+                bounds.append(i)
+                split = offset + chunk_bytes
+        bounds.append(len(entries))
+        ranges = []
+        for first, end in zip(bounds, bounds[1:]):
+            start = entries[first][0] if first else 0
+            stop = entries[end][0] if end < len(entries) else self.size
+            ranges.append((first, end, start, stop))
+        return ranges or [(0, 0, 0, self.size)]
+
+    def parse_chunks(self, types=None, names=None, scene=None, frame_range=None, workers=2,
+                     chunk_bytes=None):
+        """parse() with the chunks of the file parsed in a pool of worker processes.
+
+        Every worker parses its chunk into a scene of its own and sends it
+        back as the compact arrays of the scene cache, which are merged in
+        file order as they arrive. Only the extracted data crosses process
+        boundaries, and the file text is never held in memory as a whole.
+        """
+        # imported here, both modules depend on this one
+        from mayaascii_writer import process_pool
+        if chunk_bytes is None:
+            chunk_bytes = max(self.size // (4*workers) + 1, PARALLEL_CHUNK_BYTES)
+        if scene is None:
+            scene = MayaScene()
+        tasks = self.chunk_tasks(types, names, frame_range, chunk_bytes)
+        if len(tasks) == 1:
+            return self.parse(types, names, scene, frame_range)
+        with process_pool(min(workers, len(tasks))) as pool:
+            for result in pool.map(_parse_chunk, tasks):
+                _merge_chunk(scene, result)
+        return scene
+
+    def chunk_tasks(self, types, names, frame_range, chunk_bytes):
+        """Return the _parse_chunk arguments of the chunks of about chunk_bytes."""
+        return [(self.filename, self.entries[first:end], start, stop, types, names, frame_range)
+                for first, end, start, stop in self.chunks(chunk_bytes)]
+
+    def summary(self):
+        """Return node counts and the frame range without parsing node data."""
+        curves = set(e[3] for e in self.nodes() if e[3] and e[3].endswith('_frameExtension'))
+        scene = self.parse(types=(), names=curves)
+        frame_range = scene.playback_range
+        for name in curves:
+            keys = scene.node(name).keys()
+            if len(keys):
+                frame_range = (float(keys[0, 0]), float(keys[-1, 0]))
+                break
+        cameras = [e for e in self.nodes('camera') if not e[5]]
+        return {
+            'cameras': len(cameras),
+            'camera_names': [e[4] or e[3] for e in cameras],
+            'tracks': self.count('locator'),
+            'curves': sum(self.count(t) for t in ANIM_CURVE_TYPES),
+            'frame_range': frame_range,
+            }
@@ -0,0 +1,92 @@
+"""Phase timers, counters and optional profiling for imports and exports."""
+import collections
+import contextlib
+import cProfile
+import pstats
+import sys
+import time
+
+
+class PhaseTimer(object):
+    """Wall clock time per named phase plus named counters.
+
+    start(name) ends the running phase and starts the next one, so a long
+    function can be split into phases without restructuring it. pause()
+    and resume() leave out the time between the slices of a modal import.
+    """
+
+    def __init__(self):
+        self.phases = collections.OrderedDict()
+        self.counters = collections.OrderedDict()
+        self._phase = None
+        self._start = None
+
+    def start(self, name):
+        self.stop()
+        self._phase = name
+        self._start = time.perf_counter()
+
+    def stop(self):
+        self.pause()
+        self._phase = None
+
+    def pause(self):
+        """Stop the clock of the running phase until resume()."""
+        if self._phase is not None and self._start is not None:
+            elapsed = time.perf_counter() - self._start
+            self.phases[self._phase] = self.phases.get(self._phase, 0.0) + elapsed
+            self._start = None
+
+    def resume(self):
+        if self._phase is not None and self._start is None:
+            self._start = time.perf_counter()
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    @property
+    def total(self):
+        return sum(self.phases.values())
+
+    def summary(self):
+        """One line for Operator.report."""
+        phases = ', '.join('%s %.2fs' % item for item in self.phases.items())
+        counters = ', '.join('%d %s' % (n, name) for name, n in self.counters.items())
+        return '%.2fs (%s); %s' % (self.total, phases, counters)
+
+    def table(self):
+        """Multi-line summary for the console."""
+        lines = ['%-12s %8.3fs %5.1f%%' % (name, seconds, 100.0 * seconds / (self.total or 1))
+                 for name, seconds in self.phases.items()]
+        lines.append('%-12s %8.3fs' % ('total', self.total))
+        lines.extend('%-12s %9d' % item for item in self.counters.items())
+        return '\n'.join(lines)
+
+
+@contextlib.contextmanager
+def profiled(filename=None, top=20):
+    """Profile the block with cProfile if filename is set.
+
+    The stats are dumped to filename (readable with pstats or snakeviz) and
+    the top functions by cumulative time are printed to the console.
+    """
+    if not filename:
+        yield
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        write_profile(profile, filename, top)
+
+
+def write_profile(profile, filename, top=20):
+    """Dump a cProfile.Profile to filename and print its top functions."""
+    try:
+        profile.dump_stats(filename)
+        print('Profile written to %s' % filename)
+    except (IOError, OSError) as error:
+        print('Unable to write profile: %s' % error)
+    pstats.Stats(profile, stream=sys.stdout).sort_stats('cumulative').print_stats(top)
@@ -0,0 +1,318 @@
+"""Array-backed table of the tracks (locators) of a parsed solve."""
+import re
+
+import numpy as np
+
+# attribute plugs of a track's translation curves
+TRANSLATE_PLUGS = ('.tx', '.ty', '.tz')
+
+_NUMBER_RE = re.compile(r'(\d+)$')
+
+# a voxel and its neighbours; the voxel itself with the neighbours on one
+# side of it visit every pair of points in adjacent voxels once
+_OFFSETS = np.array([(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)],
+                    dtype=np.int64)
+_HALF_OFFSETS = _OFFSETS[13:]
+
+
+def _voxel_keys(cells):
+    """Return (keys, steps): one int64 key per row of (N, 3) voxel coordinates.
+
+    Keys are linear, so the voxel next to another along an axis is a fixed
+    step away and sorted keys stay sorted when shifted to a neighbour.
+    Grids too large for that are hashed instead (steps is None); collisions
+    only add candidates, which the distance checks remove.
+    """
+    shifted = cells - cells.min(axis=0) + 1
+    dims = shifted.max(axis=0) + 2
+    if float(dims[0]) * dims[1] * dims[2] < 2**62:
+        steps = np.array([dims[1]*dims[2], dims[2], 1], dtype=np.int64)
+        return shifted.dot(steps), steps
+    return _hash_keys(cells), None
+
+
+def _hash_keys(cells):
+    """Hash (N, 3) voxel coordinates without shifting them (see _voxel_keys)."""
+    with np.errstate(over='ignore'):
+        return (cells[:, 0]*73856093) ^ (cells[:, 1]*19349663) ^ (cells[:, 2]*83492791)
+
+
+def close_pairs(positions, distance, targets=None):
+    """Return the index arrays (i, j) of the pairs of points at most distance apart.
+
+    Without targets the pairs are within positions (every pair once, in
+    either order), with targets they are of a point and a target, j indexing targets. The
+    points are sorted by voxel in a grid with cells of that size, so the
+    candidates of every point are found with one searchsorted per
+    neighbour voxel instead of comparing all pairs.
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    count = len(positions)
+    if targets is None:
+        others = positions
+        offsets = _HALF_OFFSETS
+    else:
+        others = np.asarray(targets, dtype=np.float64).reshape(-1, 3)
+        offsets = _OFFSETS
+    first = []
+    second = []
+    if count and len(others):
+        if targets is None:
+            cells = np.floor(positions / distance).astype(np.int64)
+        else:
+            cells = np.floor(np.concatenate((positions, others)) / distance).astype(np.int64)
+        keys, steps = _voxel_keys(cells)
+        order = np.argsort(keys[:count], kind='mergesort')
+        query = keys[order]
+        query_cells = cells[order]
+        points = positions[order]
+        if targets is None:
+            other_order = order
+            searched = query
+        else:
+            other_order = np.argsort(keys[count:], kind='mergesort')
+            searched = keys[count:][other_order]
+        other_points = others[other_order]
+        for offset in offsets:
+            if steps is not None:
+                probe = query + offset.dot(steps)
+            else:
+                probe = _hash_keys(query_cells + offset)
+            low = np.searchsorted(searched, probe, 'left')
+            counts = np.searchsorted(searched, probe, 'right') - low
+            total = counts.sum()
+            if not total:
+                continue
+            # pairs of sorted positions
+            i = np.repeat(np.arange(count), counts)
+            j = np.repeat(low - np.cumsum(counts) + counts, counts) + np.arange(total)
+            if targets is None and not offset.any():
+                valid = i < j
+                i, j = i[valid], j[valid]
+            near = ((points[i] - other_points[j])**2).sum(axis=1) <= distance*distance
+            first.append(order[i[near]])
+            second.append(other_order[j[near]])
+    if not first:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.concatenate(first), np.concatenate(second)
+
+
+def _independent(positions, rank, distance):
+    """Mask of a set of points no two of which are within distance, covering the rest.
+
+    Points are settled in rounds, all at once: a point is kept when every
+    close point of lower rank is dropped, and dropped when one of them is
+    kept.
+    """
+    count = len(positions)
+    state = np.zeros(count, dtype=np.int8)
+    i, j = close_pairs(positions, distance)
+    swap = rank[i] > rank[j]
+    # a outranks b in every pair
+    a = np.where(swap, j, i)
+    b = np.where(swap, i, j)
+    blocked = np.zeros(count, dtype=bool)
+    while len(a):
+        blocked[:] = False
+        blocked[b] = True
+        state[(state == 0) & ~blocked] = 1
+        state[b[state[a] == 1]] = 2
+        undecided = (state[a] == 0) & (state[b] == 0)
+        a = a[undecided]
+        b = b[undecided]
+    return state != 2
+
+
+def merge_mask(positions, distance, seed=0):
+    """Mask of the points kept when points within distance of each other are merged.
+
+    No two kept points are within distance and every dropped point is
+    within distance of a kept one. Which point of a close group survives
+    is decided by a seeded random priority, which keeps the number of
+    rounds small even for files that list their tracks in spatial order.
+
+    Dense groups would make the number of close pairs explode, so each
+    pass only settles one point per voxel small enough that all its points
+    are within distance, and drops every point a kept point covers.
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    count = len(positions)
+    if count < 2 or distance <= 0:
+        return np.ones(count, dtype=bool)
+    rank = np.random.RandomState(seed).permutation(count)
+    kept = np.zeros(count, dtype=bool)
+    left = np.arange(count)
+    while len(left):
+        cells = np.floor(positions[left] / (distance / np.sqrt(3))).astype(np.int64)
+        keys = _voxel_keys(cells)[0]
+        order = np.lexsort((rank[left], keys))
+        keys = keys[order]
+        picked = left[order[np.concatenate(([True], keys[1:] != keys[:-1]))]]
+        picked = picked[~_covered(positions[picked], positions[kept], distance)]
+        kept[picked[_independent(positions[picked], rank[picked], distance)]] = True
+        left = left[~kept[left]]
+        left = left[~_covered(positions[left], positions[kept], distance)]
+    return kept
+
+
+def _covered(positions, targets, distance):
+    """Mask of the positions within distance of any target."""
+    covered = np.zeros(len(positions), dtype=bool)
+    covered[close_pairs(positions, distance, targets)[0]] = True
+    return covered
+
+
+def even_sample(positions, count, steps=24):
+    """Return the sorted indices of count points spread evenly over the positions.
+
+    The cell size of a voxel grid is searched so that about count cells
+    are occupied, and the point nearest to the centre of every cell is
+    kept (surplus cells are dropped at random).
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    if count >= len(positions):
+        return np.arange(len(positions))
+    if count <= 0:
+        return np.empty(0, dtype=np.intp)
+    low = positions.min(axis=0)
+    local = positions - low
+    smallest = 0.0
+    largest = float(local.max()) * 2 or 1.0
+    for _ in range(steps):
+        size = (smallest + largest) / 2
+        if len(np.unique(_hash_keys(np.floor(local / size).astype(np.int64)))) >= count:
+            smallest = size
+        else:
+            largest = size
+    if smallest == 0.0:
+        # (nearly) coincident points, one per cell isn't enough
+        picked = np.arange(len(positions))
+    else:
+        cells = np.floor(local / smallest)
+        offset = ((local - (cells + 0.5)*smallest)**2).sum(axis=1)
+        keys = _hash_keys(cells.astype(np.int64))
+        order = np.lexsort((offset, keys))
+        keys = keys[order]
+        picked = order[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    if len(picked) > count:
+        picked = np.random.RandomState(0).choice(picked, count, replace=False)
+    return np.sort(picked)
+
+
+class TrackTable(object):
+    """The tracks of a solve as parallel arrays.
+
+    ids holds the track numbers, names the names of the track transforms
+    and positions an (N, 3) array. curves is an object array with the
+    [x, y, z] key arrays of animated tracks (None for an axis without a
+    curve) and None for static tracks. The filters return boolean masks
+    over the whole table and take() applies a mask or index array, so
+    tracks can be selected, sorted or reused before any object exists.
+    """
+
+    def __init__(self, ids, names, positions, curves=None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.names = np.array(names, dtype=str).reshape(-1)
+        self.positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        if curves is None:
+            curves = np.full(len(self.ids), None, dtype=object)
+        self.curves = curves
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_scene(cls, scene, numbered=False):
+        """Collect the tracks of a MayaScene; returns (table, number of locators skipped).
+
+        Tracks are numbered in file order, or with numbered set by the
+        number at the end of their name. Positions are the translate value
+        of the track, with the first key of every animated axis. Locators
+        without a position, or without a number when numbered is set, are
+        skipped.
+        """
+        ids = []
+        names = []
+        positions = []
+        curves = []
+        skipped = 0
+        for locator in scene.nodes_of_type('locator'):
+            name = locator.parent or locator.name
+            if numbered:
+                match = _NUMBER_RE.search(name)
+                if match is None:
+                    skipped += 1
+                    continue
+            transform = scene.node(locator.parent) if locator.parent else None
+            position = transform.value('t') if transform is not None else None
+            if not isinstance(position, list) or len(position) != 3:
+                position = None
+            keys = None
+            if transform is not None:
+                keys = [scene.source(transform.name + plug) for plug in TRANSLATE_PLUGS]
+                keys = [c.keys() if c is not None else None for c in keys]
+                if not any(k is not None and len(k) for k in keys):
+                    keys = None
+            if keys is not None:
+                position = [float(v) for v in position] if position is not None else [0.0, 0.0, 0.0]
+                for axis, k in enumerate(keys):
+                    if k is not None and len(k):
+                        position[axis] = k[0, 1]
+            elif position is None:
+                skipped += 1
+                continue
+            ids.append(int(match.group(1)) if numbered else len(ids))
+            names.append(name)
+            positions.append(position)
+            curves.append(keys)
+        table_curves = np.empty(len(curves), dtype=object)
+        table_curves[:] = curves
+        return cls(ids, names, positions, table_curves), skipped
+
+    @property
+    def animated(self):
+        """Boolean mask of the tracks with curves."""
+        return np.array([c is not None for c in self.curves], dtype=bool)
+
+    def in_range(self, first=None, last=None):
+        """Mask of the tracks numbered first to last (both included, None for open)."""
+        mask = np.ones(len(self), dtype=bool)
+        if first is not None:
+            mask &= self.ids >= first
+        if last is not None:
+            mask &= self.ids <= last
+        return mask
+
+    def first(self, count):
+        """Mask of the count tracks with the lowest numbers."""
+        mask = np.zeros(len(self), dtype=bool)
+        mask[np.argsort(self.ids, kind='mergesort')[:max(count, 0)]] = True
+        return mask
+
+    def in_bounds(self, low, high):
+        """Mask of the tracks inside the box from low to high."""
+        low = np.asarray(low, dtype=np.float64)
+        high = np.asarray(high, dtype=np.float64)
+        return np.all((self.positions >= np.minimum(low, high)) &
+                      (self.positions <= np.maximum(low, high)), axis=1)
+
+    def merged(self, distance):
+        """Mask of the tracks left when tracks within distance are merged (see merge_mask)."""
+        return merge_mask(self.positions, distance)
+
+    def sample(self, count):
+        """Indices of count tracks spread evenly over the table (see even_sample)."""
+        return even_sample(self.positions, count)
+
+    def take(self, selection):
+        """Return the table of the tracks selected by a mask or index array."""
+        return TrackTable(self.ids[selection], self.names[selection], self.positions[selection],
+                          self.curves[selection])
+
+    def moved(self, positions):
+        """Return the table with the positions replaced, e.g. by converted ones."""
+        return TrackTable(self.ids, self.names, positions, self.curves)
+
+    def object_names(self, prefix):
+        """Return the <prefix>.<number> names of the tracks' objects."""
+        return [prefix + '.' + str(n).zfill(4) for n in self.ids.tolist()]
@@ -0,0 +1,196 @@
+"""Blender independent writer for Maya ASCII (.ma) statements.
+
+Every statement is formatted once and written straight to the file object,
+so nothing but the current statement is held in memory. Key arrays are
+formatted from numeric buffers in one step with a fixed float precision,
+optionally after removing the keys linear interpolation reproduces (such
+curves get linear tangents).
+"""
+import io
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from mayaascii_curves import reduce_keys
+
+# (attr, curve type) of the nine animated track channels, in the order of
+# the last axis of the arrays passed to MayaAsciiWriter.track
+TRACK_CURVES = (
+    ('tx', 'animCurveTL'), ('ty', 'animCurveTL'), ('tz', 'animCurveTL'),
+    ('rx', 'animCurveTA'), ('ry', 'animCurveTA'), ('rz', 'animCurveTA'),
+    ('sx', 'animCurveTU'), ('sy', 'animCurveTU'), ('sz', 'animCurveTU'),
+    )
+
+
+def quote(text):
+    return '"%s"' % text.replace('\\', '\\\\').replace('"', '\\"')
+
+
+class MayaAsciiWriter(object):
+    """Formats MEL statements into a text file object.
+
+    tolerances maps animation curve types to the deviation allowed when
+    their keys are reduced with reduce_keys; curves of other types are
+    written as they are.
+    """
+
+    def __init__(self, file, precision=6, tolerances=None):
+        self.file = file
+        self.precision = precision
+        self.float_format = '%%.%dg' % precision
+        self.tolerances = tolerances or {}
+        # statements and animation keys written (and removed) so far
+        self.statements = 0
+        self.keys_written = 0
+        self.keys_removed = 0
+
+    def number(self, value):
+        if isinstance(value, (int, np.integer)):
+            return '%d' % value
+        return self.float_format % value
+
+    def line(self, text):
+        self.file.write(text)
+        self.file.write(';\n')
+        self.statements += 1
+
+    def header(self, version='2010'):
+        self.file.write('//Maya ASCII %s scene\n\n' % version)
+        self.line('requires maya %s' % quote(version))
+
+    def current_unit(self, linear, angle, time):
+        self.line('currentUnit -l %s -a %s -t %s' % (linear, angle, time))
+
+    def select(self, name):
+        self.line('select -ne %s' % name)
+
+    def create_node(self, type, name, parent=None):
+        if parent is None:
+            self.line('createNode %s -n %s' % (type, quote(name)))
+        else:
+            self.line('createNode %s -n %s -p %s' % (type, quote(name), quote(parent)))
+
+    def set_attr(self, attr, *values, **options):
+        """setAttr with the given values; options: type, flags."""
+        words = ['\tsetAttr']
+        if options.get('flags'):
+            words.append(options['flags'])
+        words.append(quote('.' + attr))
+        if options.get('type'):
+            words.append('-type ' + quote(options['type']))
+        for value in values:
+            if isinstance(value, bool):
+                words.append('yes' if value else 'no')
+            elif isinstance(value, str):
+                words.append(quote(value) if options.get('type') == 'string' else value)
+            else:
+                words.append(self.number(value))
+        self.line(' '.join(words))
+
+    def keys(self, frames, values):
+        """Return the ' frame value' text of a key array."""
+        count = len(frames)
+        if not count:
+            return ''
+        keys = np.empty((count, 2), dtype=object)
+        keys[:, 0] = np.asarray(frames, dtype=np.int64).tolist()
+        keys[:, 1] = np.asarray(values, dtype=np.float64).tolist()
+        return ((' %d ' + self.float_format) * count) % tuple(keys.ravel())
+
+    def anim_curve(self, type, name, frames, values):
+        tolerance = self.tolerances.get(type)
+        if tolerance is not None:
+            count = len(frames)
+            frames, values = reduce_keys(frames, values, tolerance)
+            self.keys_removed += count - len(frames)
+        self.create_node(type, name)
+        self.file.write('\tsetAttr -s %d ".ktv[0:%d]"' % (len(frames), len(frames) - 1))
+        self.file.write(self.keys(frames, values))
+        self.file.write(';\n')
+        self.statements += 1
+        self.keys_written += len(frames)
+        if tolerance is not None:
+            # the reduction holds under linear interpolation: linear (2) in and out tangents
+            tangents = ' 2'*len(frames)
+            for attr in ('kit', 'kot'):
+                self.line('\tsetAttr -s %d ".%s[0:%d]"%s' % (len(frames), attr, len(frames) - 1, tangents))
+
+    def connect_attr(self, src, dst):
+        self.line('connectAttr %s %s' % (quote(src), quote(dst)))
+
+    def playback_options(self, start, end):
+        self.line('playbackOptions -min %d -max %d' % (start, end))
+
+    def track(self, idx, frames, channels, animated):
+        """Write Track_<idx> with its locator; channels is a (frames, 9) array."""
+        name = 'Track_%s' % idx
+        self.create_node('transform', name)
+        if animated:
+            self.create_node('locator', 'Point_%s' % idx, name)
+            self.set_attr('v', flags='-k off')
+            for i, (attr, curve_type) in enumerate(TRACK_CURVES):
+                self.anim_curve(curve_type, name + '_' + attr, frames, channels[:, i])
+            for attr, curve_type in TRACK_CURVES:
+                self.connect_attr(name + '_' + attr + '.o', name + '.' + attr)
+        else:
+            self.set_attr('t', channels[0, 0], channels[0, 1], channels[0, 2], type='double3')
+            self.create_node('locator', 'Point_%s' % idx, name)
+            self.set_attr('v', flags='-k off')
+
+    def tracks(self, data, frames, animated, workers=0, chunk_size=32):
+        """Write Track_1..Track_N for the (tracks, frames, 9) array data.
+
+        With workers > 1 the text of chunk_size tracks at a time is
+        formatted in a process pool. Chunks are written in order, so the
+        output is identical to the serial path.
+        """
+        workers = min(workers, multiprocessing.cpu_count())
+        chunks = self.track_chunks(data, frames, animated, chunk_size)
+        if workers > 1 and len(data) > chunk_size:
+            with process_pool(workers) as pool:
+                results = pool.map(_format_tracks, chunks)
+                self._write_chunks(results)
+        else:
+            self._write_chunks(_format_tracks(chunk) for chunk in chunks)
+
+    def track_chunks(self, data, frames, animated, chunk_size=32):
+        """Yield the _format_tracks arguments of every chunk_size tracks of data."""
+        for start in range(0, len(data), chunk_size):
+            yield (start + 1, data[start:start + chunk_size], frames, self.precision, animated,
+                   self.tolerances)
+
+    def _write_chunks(self, results):
+        for text, statements, keys, removed in results:
+            self.file.write(text)
+            self.statements += statements
+            self.keys_written += keys
+            self.keys_removed += removed
+
+
+def _format_tracks(chunk):
+    first, data, frames, precision, animated, tolerances = chunk
+    text = io.StringIO()
+    writer = MayaAsciiWriter(text, precision, tolerances)
+    for idx, channels in enumerate(data, first):
+        writer.track(idx, frames, channels, animated)
+    return text.getvalue(), writer.statements, writer.keys_written, writer.keys_removed
+
+
+def process_pool(workers):
+    """Return a ProcessPoolExecutor that starts fresh interpreters where possible.
+
+    Inside Blender sys.executable is the Blender binary, so the workers are
+    started with Blender's bundled Python instead.
+    """
+    app = getattr(sys.modules.get('bpy'), 'app', None)
+    python = getattr(app, 'binary_path_python', None)
+    if python and os.path.isfile(python):
+        multiprocessing.set_executable(python)
+    try:
+        return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+    except TypeError:
+        # Python < 3.7
+        return ProcessPoolExecutor(workers)
@@ -0,0 +1,75 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mayaascii_cache
+from mayaascii_cache import SceneCache
+from mayaascii_parser import parse_file
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample.ma')
+
+
+class SceneCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = SceneCache(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_load_stores_and_reuses(self):
+        scene = self.cache.load(SAMPLE, lambda: parse_file(SAMPLE))
+        cached = self.cache.load(SAMPLE, lambda: self.fail('parsed again'))
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(len(cached.nodes), len(scene.nodes))
+
+    def test_corrupt_entry_is_a_miss(self):
+        self.cache.load(SAMPLE, lambda: parse_file(SAMPLE))
+        (mtime, size, path), = self.cache.entries()
+        with open(path, 'r+b') as file:
+            file.truncate(size // 2)
+        self.assertIsNone(self.cache.get(SAMPLE))
+        self.assertFalse(os.path.exists(path))
+        # parsed and stored again
+        scene = self.cache.load(SAMPLE, lambda: parse_file(SAMPLE))
+        self.assertTrue(len(scene.nodes))
+        self.assertIsNotNone(self.cache.get(SAMPLE))
+
+    def test_first_miss_hashes_once(self):
+        # the cache directory doesn't exist yet
+        cache = SceneCache(os.path.join(self.directory, 'new'))
+        hashed = []
+        file_hash = mayaascii_cache.file_hash
+        mayaascii_cache.file_hash = lambda filename: hashed.append(filename) or file_hash(filename)
+        try:
+            cache.load(SAMPLE, lambda: parse_file(SAMPLE))
+            cache.load(SAMPLE, lambda: self.fail('parsed again'))
+        finally:
+            mayaascii_cache.file_hash = file_hash
+        self.assertEqual(hashed, [SAMPLE])
+
+    def test_evict_least_recently_used(self):
+        scene = parse_file(SAMPLE)
+        paths = []
+        for selection in range(3):
+            self.cache.put(SAMPLE, scene, selection)
+            path = self.cache._entry_path(self.cache.content_key(SAMPLE), selection)
+            os.utime(path, (1000 + selection, 1000 + selection))
+            paths.append(path)
+        # using the oldest entry makes it the most recent
+        self.assertIsNotNone(self.cache.get(SAMPLE, 0))
+        size = max(e[1] for e in self.cache.entries())
+        self.cache.max_bytes = size*5//2
+        self.cache.put(SAMPLE, scene, 3)
+        paths.append(self.cache._entry_path(self.cache.content_key(SAMPLE), 3))
+        self.assertEqual([os.path.exists(p) for p in paths], [True, False, False, True])
+        self.assertLessEqual(sum(e[1] for e in self.cache.entries()), self.cache.max_bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mayaascii_curves import reduce_keys, simplify_keys
+
+
+class SimplifyKeysTest(unittest.TestCase):
+
+    def check(self, frames, values, tolerance):
+        keep = simplify_keys(frames, values, tolerance)
+        self.assertTrue(np.all(np.diff(keep) > 0))
+        if len(keep) > 1:
+            self.assertEqual(keep[0], 0)
+            self.assertEqual(keep[-1], len(values) - 1)
+        # linear interpolation of the kept keys stays within tolerance
+        error = np.abs(np.interp(frames, frames[keep], values[keep]) - values)
+        self.assertLessEqual(error.max(), tolerance)
+        return keep
+
+    def test_noisy(self):
+        rng = np.random.RandomState(1)
+        frames = np.arange(1, 501, dtype=np.float64)
+        values = np.cumsum(rng.normal(0, 0.1, len(frames)))
+        self.assertEqual(len(self.check(frames, values, 0.0)), len(frames))
+        counts = [len(self.check(frames, values, tolerance)) for tolerance in (0.01, 0.1, 1.0)]
+        self.assertEqual(counts, sorted(counts, reverse=True))
+        self.assertLess(counts[0], len(frames))
+
+    def test_uneven_frames(self):
+        frames = np.cumsum(np.random.RandomState(2).uniform(0.5, 3.0, 200))
+        self.check(frames, np.sin(frames/10.0), 0.001)
+
+    def test_straight_line(self):
+        frames = np.arange(1, 101, dtype=np.float64)
+        self.assertEqual(self.check(frames, frames*0.5 + 2, 1e-9).tolist(), [0, 99])
+
+    def test_constant(self):
+        frames = np.arange(1, 101, dtype=np.float64)
+        self.assertEqual(simplify_keys(frames, np.full(100, 35.0), 0.0).tolist(), [0])
+        # within tolerance counts as constant
+        values = 35.0 + np.random.RandomState(3).uniform(0, 0.001, 100)
+        self.assertEqual(simplify_keys(frames, values, 0.001).tolist(), [0])
+
+    def test_short(self):
+        self.assertEqual(simplify_keys([], [], 0.1).tolist(), [])
+        self.assertEqual(simplify_keys([1, 2], [0, 5], 0.1).tolist(), [0, 1])
+
+    def test_reduce_keys(self):
+        frames = np.arange(1, 11)
+        values = np.r_[np.zeros(5), np.arange(5)]
+        kept_frames, kept_values = reduce_keys(frames, values, 0.01)
+        self.assertEqual(kept_frames.tolist(), [1, 6, 10])
+        self.assertEqual(kept_values.tolist(), [0, 0, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
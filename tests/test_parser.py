@@ -0,0 +1,289 @@
+import io
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'benchmarks')]
+
+from generate_ma import write_scene
+from mayaascii_cache import pack_scene
+from mayaascii_parser import (MayaParser, MayaScene, NodeIndex, StatementReader, _merge_chunk,
+                              _parse_chunk, decode_ktv, decode_ktv_range, parse)
+
+# the layout Maya itself writes: shared nodes are selected in the root
+# namespace (':time1') after the nodes of the file
+MAYA_FILE = b'''//Maya ASCII 2018 scene
+//Name: shot.ma
+requires maya "2018";
+currentUnit -l centimeter -a degree -t film;
+fileInfo "application" "maya";
+createNode transform -s -n "persp";
+\trename -uid "D1E5C9A0-4F0B-7A8D-21B9-0B8F1D5E6A01";
+\tsetAttr ".v" no;
+createNode camera -s -n "perspShape" -p "persp";
+\tsetAttr -k off ".v" no;
+createNode transform -n "shotCam";
+createNode camera -n "shotCamShape" -p "|shotCam";
+\tsetAttr -k off ".v";
+\tsetAttr ".fl" 40;
+createNode animCurveTL -n "shotCam_translateX";
+\tsetAttr ".tan" 18;
+\tsetAttr -s 3 ".ktv[0:2]"  1 0 2 0.5 3 1;
+select -ne :time1;
+\tsetAttr ".o" 1;
+\tsetAttr ".unw" 1;
+select -ne :defaultResolution;
+\tsetAttr ".w" 2048;
+\tsetAttr ".h" 858;
+\tsetAttr ".pa" 1;
+\tsetAttr ".dar" 2.3870627;
+select -ne :hardwareRenderingGlobals;
+\tsetAttr ".vac" 2;
+connectAttr "shotCam_translateX.o" "|shotCam.tx";
+connectAttr ":time1.o" ":defaultResolution.w";
+// End of shot.ma
+'''
+
+# statements split over lines, quoted ';' and '//', escaped quotes and
+# backslashes, comments and empty statements
+STATEMENTS = b'''//Maya ASCII 2018 scene
+// a comment; with a "quote
+requires maya "2018";
+fileInfo "comment" "a;b \\"quoted;\\" // not a comment";
+createNode transform -n "track1";
+\tsetAttr ".t" -type "double3"
+\t\t1 2
+\t\t3 ;
+createNode animCurveTL -n "track1_translateX";
+\tsetAttr -s 4 ".ktv[0:3]"  1 0 2 0.5
+\t\t3 1 4 1.5;
+select -ne :time1;;
+\tsetAttr ".imn" -type "string" "C:\\\\plates\\\\shot;1.exr";
+connectAttr "track1_translateX.o" "track1.tx";
+// End of file'''
+
+EXPECTED_STATEMENTS = [
+    ('requires', ['maya', '"2018"']),
+    ('fileInfo', ['"comment"', r'"a;b \"quoted;\" // not a comment"']),
+    ('createNode', ['transform', '-n', '"track1"']),
+    ('setAttr', ['".t"', '-type', '"double3"', '1', '2', '3']),
+    ('createNode', ['animCurveTL', '-n', '"track1_translateX"']),
+    ('setAttr', ['-s', '4', '".ktv[0:3]"', '1', '0', '2', '0.5', '3', '1', '4', '1.5']),
+    ('select', ['-ne', ':time1']),
+    ('setAttr', ['".imn"', '-type', '"string"', r'"C:\\plates\\shot;1.exr"']),
+    ('connectAttr', ['"track1_translateX.o"', '"track1.tx"']),
+    ]
+
+CHUNK_SIZES = (1, 2, 3, 5, 7, 13, 64, 1000, 1 << 16)
+
+
+class StatementReaderTest(unittest.TestCase):
+    """Statements must come out the same however the reads split them."""
+
+    def test_words(self):
+        for chunk_size in CHUNK_SIZES:
+            reader = StatementReader(io.BytesIO(STATEMENTS), chunk_size)
+            statements = []
+            for command in reader:
+                self.assertTrue(STATEMENTS.startswith(command.encode(), reader.offset))
+                statements.append((command, reader.words()))
+            self.assertEqual(statements, EXPECTED_STATEMENTS, chunk_size)
+            self.assertEqual(reader.statements, 9)
+            self.assertEqual(reader.lines, 14)
+
+    def test_partial_reads(self):
+        # unread arguments are skipped, payload() returns the raw rest
+        for chunk_size in CHUNK_SIZES:
+            reader = StatementReader(io.BytesIO(STATEMENTS), chunk_size)
+            firsts = []
+            for command in reader:
+                if command == 'fileInfo':
+                    self.assertEqual(reader.word(), '"comment"')
+                    self.assertEqual(reader.payload(), br' "a;b \"quoted;\" // not a comment"')
+                else:
+                    firsts.append(reader.word())
+            self.assertEqual(firsts, ['maya', 'transform', '".t"', 'animCurveTL', '-s', '-ne',
+                                      '".imn"', '"track1_translateX.o"'], chunk_size)
+
+    def test_parse(self):
+        for chunk_size in CHUNK_SIZES:
+            scene = MayaParser().feed(StatementReader(io.BytesIO(STATEMENTS), chunk_size))
+            self.assertEqual(scene.node('track1').value('t'), [1.0, 2.0, 3.0])
+            np.testing.assert_array_equal(scene.node('track1_translateX').keys(),
+                                          [[1, 0], [2, 0.5], [3, 1], [4, 1.5]])
+            self.assertEqual(scene.node('time1').value('imn'), r'C:\plates\shot;1.exr')
+            self.assertEqual(scene.connections, [('track1_translateX.o', 'track1.tx')])
+
+
+def ktv_payload(frames, values=None):
+    if values is None:
+        values = np.sin(np.asarray(frames, dtype=np.float64))
+    return ' '.join('%r %r' % (float(f), float(v)) for f, v in zip(frames, values)).encode()
+
+
+class DecodeKtvRangeTest(unittest.TestCase):
+    """decode_ktv_range must return the keys in [first, last] and the
+    position of the first of them in the full key array."""
+
+    def check(self, payload, first, last, index=None):
+        keys, skip = decode_ktv_range(payload, first, last, index)
+        full = decode_ktv(payload)
+        mask = (full[:, 0] >= first) & (full[:, 0] <= last)
+        np.testing.assert_array_equal(keys.reshape(-1, 2), full[mask])
+        self.assertEqual(skip, int(np.argmax(mask)) if mask.any() else 0)
+        return keys, skip
+
+    def test_per_frame(self):
+        payload = ktv_payload(range(1, 101))
+        keys, skip = self.check(payload, 10, 20)
+        self.assertEqual((len(keys), skip), (11, 9))
+        self.check(payload, 1, 100)
+        self.check(payload, 100, 100)
+        self.check(payload, 1, 1)
+
+    def test_before_first_key(self):
+        payload = ktv_payload(range(1, 101))
+        keys, skip = self.check(payload, -5, 3)
+        self.assertEqual((len(keys), skip), (3, 0))
+        keys, skip = self.check(payload, -20, -5)
+        self.assertEqual(len(keys), 0)
+
+    def test_after_last_key(self):
+        payload = ktv_payload(range(1, 101))
+        keys, skip = self.check(payload, 95, 200)
+        self.assertEqual((len(keys), skip), (6, 94))
+        keys, skip = self.check(payload, 150, 200)
+        self.assertEqual(len(keys), 0)
+
+    def test_offset_start(self):
+        payload = ktv_payload(range(1001, 1101))
+        keys, skip = self.check(payload, 1010, 1020)
+        self.assertEqual((keys[0, 0], skip), (1010, 9))
+        self.check(payload, 1, 1005)
+        self.check(payload, 1, 20)
+
+    def test_not_per_frame(self):
+        # every other frame, and a gap: found by a full decode
+        self.check(ktv_payload(range(1, 200, 2)), 10, 20)
+        self.check(ktv_payload(list(range(1, 50)) + list(range(60, 100))), 45, 70)
+        self.check(ktv_payload(np.arange(1.5, 100)), 10, 20)
+
+    def test_fractional_bounds(self):
+        payload = ktv_payload(range(1, 101))
+        keys, skip = self.check(payload, 2.5, 7.5)
+        self.assertEqual(keys[:, 0].tolist(), [3, 4, 5, 6, 7])
+        self.assertEqual(skip, 2)
+        self.check(ktv_payload(np.arange(1, 50, 0.5)), 2.25, 7.75)
+
+    def test_index_bound(self):
+        # more keys than the index header announces, e.g. keys split over statements
+        payload = ktv_payload(range(1, 101))
+        keys, skip = decode_ktv_range(payload, 10, 80, (0, 49))
+        self.assertEqual((keys[0, 0], keys[-1, 0], skip), (10, 50, 9))
+        self.check(payload, 10, 80, (0, 99))
+
+    def test_str_payload(self):
+        keys, skip = decode_ktv_range(ktv_payload(range(1, 11)).decode(), 3, 5)
+        self.assertEqual((keys[:, 0].tolist(), skip), ([3, 4, 5], 2))
+
+    def test_parser_index(self):
+        # the importer relies on the index of the decoded keys
+        text = b'createNode animCurveTL -n "c";\n\tsetAttr -s 100 ".ktv[0:99]" ' + \
+            ktv_payload(range(1, 101)) + b';\n'
+        for frame_range, index in (((10, 20), (9, 19)), ((-5, 3), (0, 2)), ((95, 200), (94, 99))):
+            attr = parse(io.BytesIO(text), frame_range=frame_range).node('c').attr('ktv')
+            self.assertEqual(attr.index, index)
+            self.assertEqual(attr.size, index[1] - index[0] + 1)
+            self.assertEqual(attr.values[0, 0], index[0] + 1)
+
+
+class ChunkedParseTest(unittest.TestCase):
+    """parse_chunks runs _parse_chunk in worker processes and merges the
+    results in file order; doing the same here must give the serial scene."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.directory, 'generated.ma')
+        with open(cls.filename, 'w') as file:
+            write_scene(file, frames=40, locators=300, animated=20, wrap=8)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def compare(self, types=None, names=None, frame_range=None):
+        index = NodeIndex(self.filename)
+        serial = index.parse(types, names, frame_range=frame_range)
+        tasks = index.chunk_tasks(types, names, frame_range, chunk_bytes=4096)
+        self.assertGreater(len(tasks), 3)
+        chunked = MayaScene()
+        for task in tasks:
+            # tasks and results cross process boundaries pickled
+            result = _parse_chunk(pickle.loads(pickle.dumps(task)))
+            _merge_chunk(chunked, pickle.loads(pickle.dumps(result)))
+
+        expected = pack_scene(serial)
+        actual = pack_scene(chunked)
+        self.assertEqual(sorted(actual), sorted(expected))
+        for key in expected:
+            np.testing.assert_array_equal(actual[key], expected[key], err_msg=key)
+        self.assertEqual(chunked.lines, serial.lines)
+        self.assertEqual(chunked.statements, serial.statements)
+        return chunked
+
+    def test_whole_file(self):
+        scene = self.compare()
+        self.assertEqual(len(scene.nodes_of_type('locator')), 300)
+        self.assertEqual(scene.playback_range, (1.0, 40.0))
+
+    def test_selection(self):
+        index = NodeIndex(self.filename)
+        names = set(e[4] for e in index.nodes('camera'))
+        self.compare(('camera', 'animCurveTL', 'animCurveTA', 'animCurveTU'), names)
+
+    def test_frame_range(self):
+        self.compare(frame_range=(10, 20))
+
+
+class MayaLayoutTest(unittest.TestCase):
+
+    def check(self, scene):
+        resolution = scene.node('defaultResolution')
+        self.assertIsNotNone(resolution)
+        self.assertEqual(resolution.value('w'), 2048)
+        self.assertEqual(resolution.value('h'), 858)
+        self.assertIs(scene.node(':defaultResolution'), resolution)
+        self.assertEqual(scene.node('shotCamShape').parent, 'shotCam')
+        self.assertEqual(scene.source('shotCam.tx').name, 'shotCam_translateX')
+        self.assertEqual(scene.source('defaultResolution.w').name, 'time1')
+        # Maya's startup cameras are shared nodes
+        self.assertTrue(scene.node('perspShape').shared)
+        self.assertFalse(scene.node('shotCamShape').shared)
+        self.assertEqual([c.name for c in scene.cameras()], ['shotCamShape'])
+
+    def test_parse(self):
+        self.check(parse(io.BytesIO(MAYA_FILE)))
+
+    def test_index(self):
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, 'shot.ma')
+            with open(filename, 'wb') as file:
+                file.write(MAYA_FILE)
+            index = NodeIndex(filename)
+            self.check(index.parse(('camera', 'animCurveTL')))
+            self.assertEqual(index.summary()['cameras'], 1)
+            self.assertEqual(index.summary()['camera_names'], ['shotCam'])
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
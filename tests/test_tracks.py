@@ -0,0 +1,111 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mayaascii_tracks import TrackTable, close_pairs, even_sample, merge_mask
+
+
+def distances(a, b):
+    return np.sqrt(((a[:, None, :] - b[None, :, :])**2).sum(axis=2))
+
+
+def solve(seed=0):
+    """Scattered tracks, a dense cluster, and tracks in spatial (file) order."""
+    rng = np.random.RandomState(seed)
+    return np.concatenate((
+        rng.uniform(-10, 10, (800, 3)),
+        rng.normal(2.0, 0.02, (400, 3)),
+        np.column_stack((np.linspace(0, 5, 300), np.zeros(300), np.zeros(300))),
+        ))
+
+
+class MergeMaskTest(unittest.TestCase):
+
+    def check(self, positions, distance):
+        kept = merge_mask(positions, distance)
+        near = distances(positions[kept], positions[kept])
+        np.fill_diagonal(near, np.inf)
+        # no two kept tracks are within distance
+        self.assertGreater(near.min(), distance)
+        # every dropped track is within distance of a kept one
+        if (~kept).any():
+            self.assertLessEqual(distances(positions[~kept], positions[kept]).min(axis=1).max(),
+                                 distance)
+        return kept
+
+    def test_solve(self):
+        positions = solve()
+        for distance in (0.05, 0.5, 2.0):
+            kept = self.check(positions, distance)
+            self.assertLess(kept.sum(), len(positions))
+
+    def test_hashed_grid(self):
+        # a grid too large for linear voxel keys
+        positions = solve()
+        positions[:3] = [[-3e6, -3e6, -3e6], [3e6, 3e6, 3e6], [3e6, 3e6, 3e6 + 0.1]]
+        kept = self.check(positions, 0.5)
+        self.assertEqual(kept[1:3].sum(), 1)
+
+    def test_coincident(self):
+        kept = self.check(np.zeros((50, 3)), 0.1)
+        self.assertEqual(kept.sum(), 1)
+
+    def test_nothing_close(self):
+        positions = np.arange(30, dtype=np.float64).reshape(10, 3)
+        self.assertTrue(merge_mask(positions, 0.5).all())
+        self.assertTrue(merge_mask(positions, 0.0).all())
+
+    def test_close_pairs(self):
+        positions = solve()[:600]
+        i, j = close_pairs(positions, 1.0)
+        pairs = set(zip(np.minimum(i, j).tolist(), np.maximum(i, j).tolist()))
+        self.assertEqual(len(pairs), len(i))
+        a, b = np.nonzero(np.triu(distances(positions, positions) <= 1.0, 1))
+        self.assertEqual(pairs, set(zip(a.tolist(), b.tolist())))
+
+
+class EvenSampleTest(unittest.TestCase):
+
+    def test_count(self):
+        positions = solve()
+        for count in (1, 7, 50, 333, 1499):
+            picked = even_sample(positions, count)
+            self.assertEqual(len(picked), count)
+            self.assertEqual(len(np.unique(picked)), count)
+            self.assertTrue(np.all(np.diff(picked) > 0))
+
+    def test_spread(self):
+        # the dense cluster holds a quarter of the tracks but gets few samples
+        positions = solve()
+        picked = even_sample(positions, 100)
+        self.assertLess(np.sum((picked >= 800) & (picked < 1200)), 10)
+
+    def test_small(self):
+        positions = solve()[:20]
+        self.assertEqual(even_sample(positions, 50).tolist(), list(range(20)))
+        self.assertEqual(len(even_sample(positions, 0)), 0)
+        self.assertEqual(len(even_sample(np.zeros((30, 3)), 10)), 10)
+
+
+class TrackTableTest(unittest.TestCase):
+
+    def setUp(self):
+        ids = [5, 1, 9, 3, 7]
+        self.tracks = TrackTable(ids, ['Track%d' % i for i in ids], np.arange(15.0).reshape(5, 3))
+
+    def test_first(self):
+        self.assertEqual(self.tracks.take(self.tracks.first(3)).ids.tolist(), [5, 1, 3])
+        self.assertEqual(self.tracks.first(0).sum(), 0)
+
+    def test_in_range(self):
+        self.assertEqual(self.tracks.take(self.tracks.in_range(None, 5)).ids.tolist(), [5, 1, 3])
+        self.assertEqual(self.tracks.take(self.tracks.in_range(4, 8)).ids.tolist(), [5, 7])
+        self.assertTrue(self.tracks.in_range().all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import io
+import os
+import pickle
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mayaascii_writer import MayaAsciiWriter, _format_tracks
+
+
+def track_data(tracks=70, frames=24, seed=0):
+    rng = np.random.RandomState(seed)
+    data = np.cumsum(rng.normal(0, 0.1, (tracks, frames, 9)), axis=1)
+    # a constant channel per track, reduced to one key with tolerances
+    data[:, :, 6:] = 1.0
+    return data, np.arange(1, frames + 1)
+
+
+class TracksTest(unittest.TestCase):
+    """The pooled path formats chunks with _format_tracks in worker processes;
+    running it on the same chunks here must give the serial output."""
+
+    def check(self, animated, tolerances=None):
+        data, frames = track_data()
+        serial = io.StringIO()
+        writer = MayaAsciiWriter(serial, 6, tolerances)
+        writer.tracks(data, frames, animated, workers=0)
+
+        pooled = io.StringIO()
+        chunked = MayaAsciiWriter(pooled, 6, tolerances)
+        chunks = list(chunked.track_chunks(data, frames, animated, chunk_size=16))
+        self.assertEqual(len(chunks), 5)
+        # chunks and results cross process boundaries pickled
+        results = [pickle.loads(pickle.dumps(_format_tracks(pickle.loads(pickle.dumps(chunk)))))
+                   for chunk in chunks]
+        chunked._write_chunks(results)
+
+        self.assertEqual(pooled.getvalue(), serial.getvalue())
+        self.assertEqual(chunked.statements, writer.statements)
+        self.assertEqual(chunked.keys_written, writer.keys_written)
+        self.assertEqual(chunked.keys_removed, writer.keys_removed)
+        self.assertIn('createNode transform -n "Track_70"', serial.getvalue())
+
+    def test_static(self):
+        self.check(False)
+
+    def test_animated(self):
+        self.check(True)
+
+    def test_reduced(self):
+        self.check(True, {'animCurveTL': 0.01, 'animCurveTA': 0.01, 'animCurveTU': 0.001})
+
+    def test_reduced_tangents(self):
+        text = io.StringIO()
+        writer = MayaAsciiWriter(text, 6, {'animCurveTL': 0.01})
+        writer.anim_curve('animCurveTL', 'reduced', np.arange(1, 11), np.r_[np.zeros(5), np.arange(5)])
+        writer.anim_curve('animCurveTU', 'kept', np.arange(1, 11), np.ones(10))
+        lines = text.getvalue().splitlines()
+        self.assertEqual(lines[1], '\tsetAttr -s 3 ".ktv[0:2]" 1 0 6 0 10 4;')
+        self.assertEqual(lines[2], '\tsetAttr -s 3 ".kit[0:2]" 2 2 2;')
+        self.assertEqual(lines[3], '\tsetAttr -s 3 ".kot[0:2]" 2 2 2;')
+        # curves that aren't reduced keep Maya's default tangents
+        self.assertNotIn('.kit', ''.join(lines[4:]))
+
+
+if __name__ == '__main__':
+    unittest.main()